@@ -0,0 +1,447 @@
+"""
+Shared helpers for the Perplexity-driven trade bots (ceo_bot.py, congress_bot.py).
+
+Holds the pooled HTTP session (also used by earnings_bot.py, price_alert_bot.py and
+interactive_bot.py), the Perplexity call (with a small on-disk
+response cache), FMP batch quotes, Discord webhook posting and the posted-trades dedupe file
+so each bot only defines its prompt and embed formatting.
+"""
+
+import os
+import re
+import time
+import hashlib
+import logging
+import functools
+from collections import deque
+from dataclasses import dataclass, fields
+from datetime import date, timedelta
+from typing import Optional
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Errors and warnings from the helpers; bots that configure logging control
+# its level with set_log_level, the rest see warnings via logging's fallback
+log = logging.getLogger(__name__)
+
+# API Configuration
+PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
+PERPLEXITY_API_URL = "https://api.perplexity.ai/chat/completions"
+
+
+class _PostSafeRetry(Retry):
+    """
+    Retry policy that never repeats a POST the server may have acted on.
+    A POST is retried only after a connect error (nothing was sent), any
+    429 (a refusal, so it can't double-post or double-bill) or a 503
+    carrying Retry-After. Read timeouts and other 5xx could mean a webhook
+    already posted or a completion was already billed, so those raise
+    instead. Retried POSTs get the same backoff and jitter as GETs.
+    """
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if method == "POST":
+            return bool(self.total and (status_code == 429 or (status_code == 503 and has_retry_after)))
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+# Shared HTTP session so API calls and Discord batches reuse keep-alive
+# connections instead of paying a TCP+TLS handshake per request. The pool is
+# sized for earnings_bot's concurrent per-ticker lookups.
+# GETs are retried on 429/5xx and read errors. POST stays out of
+# allowed_methods, so read errors on it are never retried; see
+# _PostSafeRetry for the statuses it is retried on.
+# Backoff is exponential (0.5s, 1s, 2s, capped at 8s) plus up to 0.5s of
+# jitter so concurrent lookups don't retry in lockstep; a Retry-After header
+# on a 429/503 takes precedence.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=_PostSafeRetry(
+    total=4,
+    backoff_factor=0.5,
+    backoff_max=8,
+    backoff_jitter=0.5,
+    respect_retry_after_header=True,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=frozenset({"GET"}),
+)))
+
+# Seconds to wait for a TCP/TLS connection; read timeouts are set per call
+CONNECT_TIMEOUT = 5
+
+FMP_STABLE_URL = "https://financialmodelingprep.com/stable"
+
+# Symbols per FMP batch-quote request, keeping the URL well within limits
+QUOTE_BATCH_SIZE = 50
+
+# Keep at most this many posted trade keys on disk
+POSTED_HISTORY_SIZE = 500
+
+# On-disk cache for API responses, so reruns within a TTL skip the network
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+# prune_cache deletes entries written longer ago than this. Anything older
+# is past every read-side TTL except the settled-data ones (old calendars,
+# report numbers, insights), which only matter when rerunning an old date
+# and are simply refetched then
+CACHE_MAX_AGE = 90 * 24 * 3600
+
+# Perplexity replies already fetched by this process, keyed like the disk cache
+_PERPLEXITY_MEMO = {}
+
+_CITATION_RE = re.compile(r'\[\d+\]')
+
+_MONTH_NAMES = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+)
+
+# One flat JSON object per trade; Perplexity sometimes wraps them in prose or
+# numbering, so match the objects themselves rather than whole lines
+_JSON_OBJ_RE = re.compile(r'\{[^{}\n]*\}')
+
+
+def strip_citations(text: str) -> str:
+    """Remove citation references like [1], [2][3], etc. from text."""
+    # Most short answers (YES/NO, dates) carry no citations; skip the regex
+    if '[' not in text:
+        return text.strip()
+    return _CITATION_RE.sub('', text).strip()
+
+
+def env_log_level(default: str = "INFO") -> str:
+    """
+    Return the LOG_LEVEL environment variable as a logging level name. A
+    typo falls back to default with a warning instead of making
+    Logger.setLevel raise before the bot has done anything.
+    """
+    level = os.getenv("LOG_LEVEL", default).upper()
+    if level not in logging.getLevelNamesMapping():
+        log.warning("Warning: unknown LOG_LEVEL %r, using %s", level, default)
+        return default
+    return level
+
+
+def set_log_level(logger: logging.Logger, verbose: bool = False):
+    """
+    Set a bot's logger and this module's to DEBUG with verbose, otherwise to
+    LOG_LEVEL. urllib3 stays at the root's level, since its debug lines
+    would print request URLs, API keys included.
+    """
+    level = logging.DEBUG if verbose else env_log_level()
+    logger.setLevel(level)
+    log.setLevel(level)
+
+
+def _cache_path(namespace: str, key: str) -> str:
+    """Map a cache key to its file under CACHE_DIR/namespace."""
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return os.path.join(CACHE_DIR, namespace, f"{digest}.json")
+
+
+def cache_get(namespace: str, key: str, ttl: Optional[float] = None):
+    """
+    Return the cached value for key, or None if it is missing or was
+    written more than ttl seconds ago (no ttl = never expires).
+    """
+    path = _cache_path(namespace, key)
+    try:
+        if ttl is not None and time.time() - os.path.getmtime(path) > ttl:
+            return None
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+
+def cache_set(namespace: str, key: str, value):
+    """Store a JSON-serializable value for key, replacing the file atomically."""
+    path = _cache_path(namespace, key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(orjson.dumps(value))
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        log.warning("Warning: could not write cache entry: %s", e)
+
+
+def prune_cache(max_age: float = CACHE_MAX_AGE) -> int:
+    """
+    Delete cache entries (and stray .tmp files) written more than max_age
+    seconds ago, so the cache restored between workflow runs stays bounded.
+    Returns the number of files removed.
+    """
+    cutoff = time.time() - max_age
+    removed = 0
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                continue
+    return removed
+
+
+@functools.lru_cache(maxsize=4)
+def _lookback_range(today: date, days: int) -> tuple[str, str]:
+    start = today - timedelta(days=days)
+    # Same output as strftime("%B %d, %Y") without the per-call locale lookup
+    return (
+        f"{_MONTH_NAMES[start.month - 1]} {start.day:02d}, {start.year}",
+        f"{_MONTH_NAMES[today.month - 1]} {today.day:02d}, {today.year}",
+    )
+
+
+def lookback_range(days: int) -> tuple[str, str]:
+    """Return (from_date, to_date) for the last `days` days, e.g. "January 25, 2026"."""
+    return _lookback_range(date.today(), days)
+
+
+def _read_stream(response, stop_marker: str) -> str:
+    """
+    Collect the reply text from a streamed (SSE) completion, stopping as soon
+    as stop_marker shows up so the connection is dropped mid-generation.
+    """
+    content = ""
+    for line in response.iter_lines():
+        if not line.startswith(b"data: "):
+            continue
+        data = line[6:]
+        if data == b"[DONE]":
+            break
+        delta = orjson.loads(data).get("choices", [{}])[0].get("delta", {}).get("content") or ""
+        content += delta
+        # Only the newly added text (plus enough overlap for a marker split
+        # across chunks) can contain a fresh match
+        if stop_marker in content[-(len(delta) + len(stop_marker)):].upper():
+            break
+    return content
+
+
+def call_perplexity(prompt: str, max_tokens: int, timeout: int = 60, cache_ttl: Optional[float] = None,
+                    stop_marker: Optional[str] = None, response_format: Optional[dict] = None) -> str:
+    """
+    Send a single user prompt to Perplexity's sonar model.
+    Returns the reply text with citations stripped.
+    With cache_ttl set, an identical prompt answered within the last
+    cache_ttl seconds is served from memory or disk instead.
+    With stop_marker set (e.g. "NO_TRADES"), the reply is streamed and cut
+    off as soon as the marker appears; the returned text still contains it.
+    response_format is passed through for structured (JSON schema) replies.
+    Raises requests.RequestException on HTTP errors.
+    """
+    cache_key = f"{max_tokens}|{prompt}"
+    if response_format:
+        cache_key += "|" + orjson.dumps(response_format).decode()
+    if cache_ttl is not None:
+        if cache_key in _PERPLEXITY_MEMO:
+            return _PERPLEXITY_MEMO[cache_key]
+        cached = cache_get("perplexity", cache_key, cache_ttl)
+        if cached is not None:
+            _PERPLEXITY_MEMO[cache_key] = cached
+            return cached
+
+    headers = {
+        "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
+        "Content-Type": "application/json"
+    }
+
+    payload = {
+        "model": "sonar",
+        "messages": [
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ],
+        "max_tokens": max_tokens
+    }
+    if response_format:
+        payload["response_format"] = response_format
+
+    if stop_marker:
+        payload["stream"] = True
+        # Leaving the block closes the connection, abandoning the rest of an
+        # early-aborted reply
+        with SESSION.post(
+            PERPLEXITY_API_URL,
+            headers=headers,
+            data=orjson.dumps(payload),
+            timeout=(CONNECT_TIMEOUT, timeout),
+            stream=True
+        ) as response:
+            response.raise_for_status()
+            content = _read_stream(response, stop_marker.upper()).strip()
+    else:
+        response = SESSION.post(
+            PERPLEXITY_API_URL,
+            headers=headers,
+            data=orjson.dumps(payload),
+            timeout=(CONNECT_TIMEOUT, timeout)
+        )
+        response.raise_for_status()
+
+        # Decode straight from the body bytes; only the reply text is kept
+        data = orjson.loads(response.content)
+        content = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+
+    content = strip_citations(content)
+
+    if cache_ttl is not None:
+        _PERPLEXITY_MEMO[cache_key] = content
+        cache_set("perplexity", cache_key, content)
+
+    return content
+
+
+def parse_json_objects(content: str) -> list:
+    """Parse every flat JSON object in a Perplexity reply, skipping malformed ones."""
+    # Chatty "nothing found" replies skip the scan entirely; every regex match
+    # already starts with "{" and ends with "}", so no per-match check is needed
+    if "{" not in content:
+        return []
+
+    objects = []
+    for match in _JSON_OBJ_RE.findall(content):
+        try:
+            objects.append(orjson.loads(match))
+        except orjson.JSONDecodeError:
+            continue
+    return objects
+
+
+@dataclass(frozen=True, slots=True)
+class Trade:
+    """
+    Base for the typed trade records each bot parses from Perplexity's JSON
+    lines. Subclasses add their own fields; defaults double as display values.
+    """
+    ticker: str = "N/A"
+    trade_date: str = "N/A"
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Build a trade from one parsed JSON object, ignoring unknown keys and nulls."""
+        return cls(**{
+            f.name: str(data[f.name])
+            for f in fields(cls)
+            if data.get(f.name) is not None
+        })
+
+
+def post_to_discord(webhook_url: str, embeds: list) -> bool:
+    """Post embeds to a Discord webhook."""
+    if not webhook_url:
+        log.error("Error: Discord webhook URL not set")
+        return False
+
+    # Discord allows max 10 embeds per message
+    for i in range(0, len(embeds), 10):
+        batch = embeds[i:i+10]
+        payload = {"embeds": batch}
+
+        try:
+            response = SESSION.post(
+                webhook_url,
+                data=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"},
+                timeout=(CONNECT_TIMEOUT, 30)
+            )
+            response.raise_for_status()
+        except requests.RequestException as e:
+            log.error("Error posting to Discord: %s", e)
+            return False
+
+        # Batches must stay sequential so the summary lands first, so pace
+        # them off Discord's rate-limit bucket instead of tripping a 429
+        if i + 10 < len(embeds) and response.headers.get("X-RateLimit-Remaining") == "0":
+            time.sleep(float(response.headers.get("X-RateLimit-Reset-After", 1)))
+
+    return True
+
+
+def fetch_stock_quotes_bulk(tickers: list, api_key: str) -> dict:
+    """
+    Fetch FMP quotes for many tickers, QUOTE_BATCH_SIZE symbols per request.
+    Returns {ticker: quote}; tickers the batches didn't cover are left out,
+    so callers fall back to a single-ticker quote for them.
+    """
+    quotes = {}
+
+    for i in range(0, len(tickers), QUOTE_BATCH_SIZE):
+        params = {"symbols": ",".join(tickers[i:i + QUOTE_BATCH_SIZE]), "apikey": api_key}
+        try:
+            response = SESSION.get(f"{FMP_STABLE_URL}/batch-quote", params=params,
+                                   timeout=(CONNECT_TIMEOUT, 20))
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+        except (requests.RequestException, orjson.JSONDecodeError) as e:
+            log.warning("Error fetching batch quotes: %s", e)
+            continue
+
+        # Plan/key errors come back as a JSON object instead of a list
+        if isinstance(data, list):
+            quotes.update(
+                (row["symbol"].upper(), row) for row in data if isinstance(row, dict) and row.get("symbol")
+            )
+
+    return quotes
+
+
+def hash_trade_key(*parts: str) -> str:
+    """Digest the canonical trade key fields into the fixed 24-char token stored on disk."""
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=12).hexdigest()
+
+
+def load_posted(filepath: str) -> tuple[set, deque]:
+    """
+    Load previously posted trade keys from the append-only log (one key per
+    line), falling back to the legacy JSON list next to it.
+    Returns (set for membership checks, deque in posting order). The deque
+    holds the last POSTED_HISTORY_SIZE keys and drops the oldest as new ones
+    are appended.
+    """
+    history = deque(maxlen=POSTED_HISTORY_SIZE)
+    legacy_path = os.path.splitext(filepath)[0] + ".json"
+    if os.path.exists(filepath):
+        try:
+            with open(filepath) as f:
+                history.extend(f.read().split())
+        except IOError:
+            pass
+    elif os.path.exists(legacy_path):
+        try:
+            with open(legacy_path, "rb") as f:
+                # Rehash plain-text keys written before keys were hashed
+                history.extend(
+                    hash_trade_key(key) if "|" in key else key
+                    for key in orjson.loads(f.read())
+                )
+        except (orjson.JSONDecodeError, IOError):
+            pass
+    return set(history), history
+
+
+def save_posted(new_keys: list, history: deque, filepath: str):
+    """
+    Append newly posted trade keys to the log. The file is only rewritten
+    (from history, oldest first) when it is missing or has grown past twice
+    POSTED_HISTORY_SIZE lines, so most runs write just the new lines.
+    """
+    # Every key is 24 hex chars plus a newline
+    max_size = 2 * POSTED_HISTORY_SIZE * 25
+    if os.path.exists(filepath) and os.path.getsize(filepath) <= max_size:
+        with open(filepath, "a") as f:
+            f.writelines(f"{key}\n" for key in new_keys)
+    else:
+        with open(filepath, "w") as f:
+            f.writelines(f"{key}\n" for key in history)
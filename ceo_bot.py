@@ -12,54 +12,53 @@ Usage:
 
 import os
 import sys
-import re
 import argparse
-import json
-from datetime import datetime, timedelta
-from typing import Optional
-import requests
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# API Configuration
-PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
+from dataclasses import dataclass
+from bots_common import (
+    PERPLEXITY_API_KEY,
+    Trade,
+    call_perplexity,
+    lookback_range,
+    parse_json_objects,
+    post_to_discord,
+    hash_trade_key,
+    load_posted,
+    save_posted
+)
+
+# API Configuration (bots_common loads .env on import)
 CEO_WEBHOOK_URL = os.getenv("CONGRESS_DISCORD_WEBHOOK_URL")
-PERPLEXITY_API_URL = "https://api.perplexity.ai/chat/completions"
+POSTED_TRADES_FILE = "posted_insider_trades.log"
 
 # Minimum trade size to alert on (in dollars)
 MIN_TRADE_SIZE = 100000
 
+# Reruns within this window reuse the last Perplexity reply (seconds)
+PERPLEXITY_CACHE_TTL = 15 * 60
+
 
-def strip_citations(text: str) -> str:
-    """Remove citation references like [1], [2][3], etc. from text."""
-    return re.sub(r'\[\d+\]', '', text).strip()
+@dataclass(frozen=True, slots=True)
+class InsiderTrade(Trade):
+    """One insider purchase as returned by Perplexity."""
+    executive: str = "Unknown"
+    title: str = "Executive"
+    company: str = ""
+    value: str = "N/A"
+    shares: str = "N/A"
 
 
 def fetch_insider_trades(days: int = 7) -> list:
     """
     Fetch recent CEO/insider purchases using Perplexity AI.
-    Returns a list of trade dictionaries.
+    Returns a list of InsiderTrade records.
     """
     if not PERPLEXITY_API_KEY:
         return []
 
     try:
-        headers = {
-            "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        from_date = (datetime.now() - timedelta(days=days)).strftime("%B %d, %Y")
-        to_date = datetime.now().strftime("%B %d, %Y")
+        from_date, to_date = lookback_range(days)
 
-        payload = {
-            "model": "sonar",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": f"""Find all significant stock PURCHASES (not sales) by company CEOs, CFOs, COOs, CTOs, or other C-suite executives disclosed between {from_date} and {to_date} that are worth $100,000 or more.
+        prompt = f"""Find all significant stock PURCHASES (not sales) by company CEOs, CFOs, COOs, CTOs, or other C-suite executives disclosed between {from_date} and {to_date} that are worth $100,000 or more.
 
 Look for insider buying activity reported in SEC Form 4 filings, financial news, and insider trading databases.
 
@@ -67,55 +66,35 @@ For each trade, provide in this EXACT JSON format (one trade per line):
 {{"ticker": "AAPL", "executive": "Tim Cook", "title": "CEO", "company": "Apple Inc.", "value": "$500,000", "shares": "5,000", "trade_date": "2026-01-25"}}
 
 Only include PURCHASES over $100,000 by C-suite executives. Return ONLY the JSON lines, no other text. If no trades found, return: NO_TRADES"""
-                }
-            ],
-            "max_tokens": 1000
-        }
 
-        response = requests.post(
-            PERPLEXITY_API_URL,
-            headers=headers,
-            json=payload,
-            timeout=60
+        content = call_perplexity(
+            prompt,
+            max_tokens=1000,
+            cache_ttl=PERPLEXITY_CACHE_TTL,
+            stop_marker="NO_TRADES"
         )
-        response.raise_for_status()
-
-        data = response.json()
-        content = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-        content = strip_citations(content)
 
         if "NO_TRADES" in content.upper():
             return []
 
-        # Parse JSON lines
-        trades = []
-        for line in content.split("\n"):
-            line = line.strip()
-            if line.startswith("{") and line.endswith("}"):
-                try:
-                    trade = json.loads(line)
-                    trades.append(trade)
-                except json.JSONDecodeError:
-                    continue
-
-        return trades
+        return [InsiderTrade.from_dict(t) for t in parse_json_objects(content)]
 
     except Exception as e:
         print(f"Error fetching insider trades: {e}")
         return []
 
 
-def create_trade_embed(trade: dict) -> dict:
+def create_trade_embed(trade: InsiderTrade) -> dict:
     """
     Create a Discord embed for a CEO purchase.
     """
-    ticker = trade.get("ticker", "N/A")
-    executive = trade.get("executive", "Unknown")
-    title = trade.get("title", "Executive")
-    company = trade.get("company", "")
-    trade_date = trade.get("trade_date", "N/A")
-    value = trade.get("value", "N/A")
-    shares = trade.get("shares", "N/A")
+    ticker = trade.ticker
+    executive = trade.executive
+    title = trade.title
+    company = trade.company
+    trade_date = trade.trade_date
+    value = trade.value
+    shares = trade.shares
 
     embed = {
         "title": f"👔 Insider Buy Alert: {ticker}",
@@ -158,61 +137,18 @@ def create_summary_embed(num_trades: int, total_executives: int) -> dict:
     }
 
 
-def post_to_discord(embeds: list) -> bool:
-    """Post embeds to Discord webhook."""
-    if not CEO_WEBHOOK_URL:
-        print("Error: CONGRESS_DISCORD_WEBHOOK_URL not set")
-        return False
-
-    # Discord allows max 10 embeds per message
-    for i in range(0, len(embeds), 10):
-        batch = embeds[i:i+10]
-        payload = {"embeds": batch}
-
-        try:
-            response = requests.post(
-                CEO_WEBHOOK_URL,
-                json=payload,
-                timeout=30
-            )
-            response.raise_for_status()
-        except requests.RequestException as e:
-            print(f"Error posting to Discord: {e}")
-            return False
-
-    return True
-
-
-def get_trade_key(trade: dict) -> str:
+def get_trade_key(trade: InsiderTrade) -> str:
     """Generate a unique key for a trade to track duplicates.
-    Uses last name + ticker + trade date to avoid mismatches from
+    Hashes last name + ticker + trade date to avoid mismatches from
     Perplexity returning slightly different text each run (e.g.
     '$100,970' vs '$100970' or 'Jacques Chappuis' vs 'Jacques M. Chappuis').
     """
-    executive = trade.get("executive", "").lower().strip()
+    executive = trade.executive.lower().strip()
     # Use last name only to avoid middle initial / name format variations
     last_name = executive.split()[-1] if executive else "unknown"
-    ticker = trade.get("ticker", "").upper().strip()
-    trade_date = trade.get("trade_date", "").strip()
-    return f"{last_name}|{ticker}|{trade_date}"
-
-
-def load_posted_trades(filepath: str = "posted_insider_trades.json") -> set:
-    """Load set of previously posted trade keys."""
-    if os.path.exists(filepath):
-        try:
-            with open(filepath, "r") as f:
-                return set(json.load(f))
-        except (json.JSONDecodeError, IOError):
-            pass
-    return set()
-
-
-def save_posted_trades(posted: set, filepath: str = "posted_insider_trades.json"):
-    """Save posted trade keys, keeping only last 500 to prevent file growth."""
-    posted_list = sorted(posted)[-500:]
-    with open(filepath, "w") as f:
-        json.dump(posted_list, f, indent=2)
+    ticker = trade.ticker.upper().strip()
+    trade_date = trade.trade_date.strip()
+    return hash_trade_key(last_name, ticker, trade_date)
 
 
 def process_insider_purchases(days: int = 7) -> list:
@@ -229,29 +165,38 @@ def process_insider_purchases(days: int = 7) -> list:
     if not trades:
         return []
 
-    # Filter out already-posted trades
-    posted = load_posted_trades()
+    # Filter out trades Perplexity repeated within this reply, then
+    # already-posted trades
+    posted, history = load_posted(POSTED_TRADES_FILE)
+    seen = set()
     new_trades = []
+    new_keys = []
     for trade in trades:
         key = get_trade_key(trade)
+        if key in seen:
+            continue
+        seen.add(key)
+
         if key not in posted:
             new_trades.append(trade)
             posted.add(key)
+            new_keys.append(key)
+            history.append(key)
         else:
-            print(f"  Skipping already posted: {trade.get('executive', '')} - {trade.get('ticker', '')}")
+            print(f"  Skipping already posted: {trade.executive} - {trade.ticker}")
 
-    print(f"New trades to post: {len(new_trades)} (skipped {len(trades) - len(new_trades)} duplicates)")
+    print(f"New trades to post: {len(new_trades)} (skipped {len(seen) - len(new_trades)} already posted, {len(trades) - len(seen)} repeated)")
 
     if not new_trades:
         return []
 
     # Save updated posted trades
-    save_posted_trades(posted)
+    save_posted(new_keys, history, POSTED_TRADES_FILE)
 
     embeds = []
 
     # Get unique executives
-    executives = set(t.get("executive", "") for t in new_trades)
+    executives = {t.executive for t in new_trades}
 
     # Add summary
     if len(new_trades) > 1:
@@ -294,7 +239,7 @@ def run_test():
         }
     ]
 
-    if post_to_discord(test_embeds):
+    if post_to_discord(CEO_WEBHOOK_URL, test_embeds):
         print("✅ Test embeds posted successfully!")
     else:
         print("❌ Failed to post test embeds")
@@ -335,7 +280,7 @@ def main():
         return
 
     # Post to Discord
-    if post_to_discord(embeds):
+    if post_to_discord(CEO_WEBHOOK_URL, embeds):
         print(f"✅ Posted {len(embeds)} embeds to Discord")
     else:
         print("❌ Failed to post to Discord")
@@ -1,7 +1,7 @@
 # EarningsBot Configuration
 # Capital Gains Multiplier Watchlist (49 companies)
 
-WATCHED_TICKERS = [
+WATCHED_TICKERS = (
     # SaaS & Cloud
     "ASAN", "DOCN", "DOCS", "HUBS", "MNDY", "CRWD", "DDOG", "NET", "S",
     # E-commerce & Marketplaces
@@ -18,7 +18,10 @@ WATCHED_TICKERS = [
     "KNSL", "TSLA", "ASML", "MU", "ENPH",
     # Healthcare & Specialty
     "MEDP", "TMDX", "RACE",
-]
+)
+
+# Same tickers as a set, for membership checks
+WATCHED_TICKERS_SET = frozenset(WATCHED_TICKERS)
 
 # Discord Webhook URL (get from Server Settings → Integrations → Webhooks)
 # Set this as an environment variable: DISCORD_WEBHOOK_URL
@@ -2,7 +2,7 @@
 """Quick debug script to see what the FMP API returns."""
 
 import os
-import json
+import orjson
 import requests
 from dotenv import load_dotenv
 
@@ -11,20 +11,22 @@ load_dotenv()
 FMP_API_KEY = os.getenv("FMP_API_KEY")
 FMP_STABLE_URL = "https://financialmodelingprep.com/stable"
 
+session = requests.Session()
+
 # Fetch earnings calendar for Jan 28
 url = f"{FMP_STABLE_URL}/earnings-calendar"
 params = {"from": "2026-01-28", "to": "2026-01-28", "apikey": FMP_API_KEY}
 
-response = requests.get(url, params=params, timeout=30)
-data = response.json()
+response = session.get(url, params=params, timeout=30)
+data = orjson.loads(response.content)
 
 # Find META in the results
 for item in data:
     if item.get("symbol") == "META":
         print("META earnings data from API:")
-        print(json.dumps(item, indent=2))
+        print(orjson.dumps(item, option=orjson.OPT_INDENT_2).decode())
         break
 else:
     print("META not found. First item in response:")
     if data:
-        print(json.dumps(data[0], indent=2))
+        print(orjson.dumps(data[0], option=orjson.OPT_INDENT_2).decode())
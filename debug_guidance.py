@@ -1,78 +1,119 @@
 #!/usr/bin/env python3
-"""Debug script to check transcript fetching and guidance extraction."""
+"""Debug script to check transcript fetching and guidance extraction.
+
+Usage:
+    python debug_guidance.py              # META only
+    python debug_guidance.py META TSLA    # Several tickers, fetched concurrently
+    python debug_guidance.py --watched    # Every ticker in config.WATCHED_TICKERS
+"""
 
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 import anthropic
 
+from config import WATCHED_TICKERS
+
 load_dotenv()
 
 FMP_API_KEY = os.getenv("FMP_API_KEY")
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 FMP_STABLE_URL = "https://financialmodelingprep.com/stable"
 
+# Cap in-flight FMP requests to stay inside the plan's rate limit
+MAX_CONCURRENT_REQUESTS = 10
+
+# Roughly 8k input tokens at ~4 chars/token; guidance sits near the end of a call
+TRANSCRIPT_TAIL_TOKENS = 8000
+CHARS_PER_TOKEN = 4
+
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_maxsize=MAX_CONCURRENT_REQUESTS))
+
 print(f"FMP API Key: {FMP_API_KEY[:10]}...")
 print(f"Anthropic API Key: {ANTHROPIC_API_KEY[:20]}...")
 
-# Try to fetch META Q4 2025 transcript
-ticker = "META"
+# Try to fetch Q4 2025 transcripts
+args = sys.argv[1:]
+tickers = list(WATCHED_TICKERS) if args == ["--watched"] else [t.upper() for t in args] or ["META"]
 year = 2025
 quarter = 4
 
-print(f"\n--- Fetching transcript for {ticker} Q{quarter} {year} ---")
-url = f"{FMP_STABLE_URL}/earning-call-transcript"
-params = {"symbol": ticker, "year": year, "quarter": quarter, "apikey": FMP_API_KEY}
-
-response = requests.get(url, params=params, timeout=30)
-print(f"Status code: {response.status_code}")
-
-data = response.json()
-print(f"Response type: {type(data)}")
-
-if isinstance(data, list):
-    print(f"List length: {len(data)}")
-    if data:
-        print(f"First item keys: {data[0].keys() if isinstance(data[0], dict) else 'not a dict'}")
-        content = data[0].get("content", "")
-        print(f"Content length: {len(content)} chars")
-        if content:
-            print(f"First 500 chars:\n{content[:500]}")
-elif isinstance(data, dict):
-    print(f"Dict keys: {data.keys()}")
-    if "Error Message" in data:
-        print(f"Error: {data['Error Message']}")
-else:
-    print(f"Raw response: {data}")
-
-# If we got content, try Claude extraction
-if isinstance(data, list) and data and data[0].get("content"):
-    content = data[0]["content"]
-    print(f"\n--- Testing Claude extraction ---")
-
-    client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-
-    # Truncate if needed
-    if len(content) > 30000:
-        content = content[-30000:]
-
-    try:
-        message = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=150,
-            messages=[
-                {
-                    "role": "user",
-                    "content": f"""Extract the forward guidance from this {ticker} earnings call transcript.
+
+def fetch_transcript(ticker):
+    """Fetch one transcript; returns (status_code, parsed JSON)."""
+    url = f"{FMP_STABLE_URL}/earning-call-transcript"
+    params = {"symbol": ticker, "year": year, "quarter": quarter, "apikey": FMP_API_KEY}
+    response = session.get(url, params=params, timeout=30)
+    return response.status_code, orjson.loads(response.content)
+
+
+def transcript_tail(content, max_tokens=TRANSCRIPT_TAIL_TOKENS):
+    """Keep the last ~max_tokens of a transcript, starting on a sentence boundary."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(content) <= max_chars:
+        return content
+    tail = content[-max_chars:]
+    # Drop the partial sentence the cut landed in
+    start = tail.find(". ")
+    return tail[start + 2:] if start != -1 else tail
+
+
+# Requests overlap; results come back in ticker order
+with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as pool:
+    results = list(pool.map(fetch_transcript, tickers))
+
+client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+
+for ticker, (status_code, data) in zip(tickers, results):
+    print(f"\n--- Fetching transcript for {ticker} Q{quarter} {year} ---")
+    print(f"Status code: {status_code}")
+    print(f"Response type: {type(data)}")
+
+    if isinstance(data, list):
+        print(f"List length: {len(data)}")
+        if data:
+            print(f"First item keys: {data[0].keys() if isinstance(data[0], dict) else 'not a dict'}")
+            content = data[0].get("content", "")
+            print(f"Content length: {len(content)} chars")
+            if content:
+                print(f"First 500 chars:\n{content[:500]}")
+    elif isinstance(data, dict):
+        print(f"Dict keys: {data.keys()}")
+        if "Error Message" in data:
+            print(f"Error: {data['Error Message']}")
+    else:
+        print(f"Raw response: {data}")
+
+    # If we got content, try Claude extraction
+    if isinstance(data, list) and data and data[0].get("content"):
+        content = data[0]["content"]
+        print(f"\n--- Testing Claude extraction ---")
+
+        content = transcript_tail(content)
+        print(f"Sending last {len(content)} chars (~{len(content) // CHARS_PER_TOKEN} tokens)")
+
+        try:
+            message = client.messages.create(
+                model="claude-sonnet-4-20250514",
+                max_tokens=150,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": f"""Extract the forward guidance from this {ticker} earnings call transcript.
 Focus on: revenue guidance, EPS guidance, growth expectations, or outlook for next quarter/year.
 Return a concise 1-2 sentence summary. If no clear guidance is given, return "No specific guidance provided."
 
 Transcript:
 {content}"""
-                }
-            ]
-        )
-        guidance = message.content[0].text.strip()
-        print(f"Claude response:\n{guidance}")
-    except Exception as e:
-        print(f"Claude error: {e}")
+                    }
+                ]
+            )
+            guidance = message.content[0].text.strip()
+            print(f"Claude response:\n{guidance}")
+        except Exception as e:
+            print(f"Claude error: {e}")
@@ -2,6 +2,7 @@
 """Debug Perplexity guidance extraction."""
 
 import os
+import orjson
 import requests
 from dotenv import load_dotenv
 
@@ -10,8 +11,12 @@ load_dotenv()
 PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
 PERPLEXITY_API_URL = "https://api.perplexity.ai/chat/completions"
 
-def test_guidance(ticker, quarter, year):
-    print(f"\n--- Testing {ticker} Q{quarter} {year} ---")
+# Reuse one connection across the test calls
+session = requests.Session()
+
+def test_guidance(tickers, quarter, year):
+    """Ask for every ticker's guidance in one prompt and parse the JSON array reply."""
+    print(f"\n--- Testing {', '.join(tickers)} Q{quarter} {year} ---")
 
     headers = {
         "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
@@ -23,17 +28,18 @@ def test_guidance(ticker, quarter, year):
         "messages": [
             {
                 "role": "user",
-                "content": f"""What is {ticker}'s forward guidance from their Q{quarter} {year} earnings report?
+                "content": f"""For each of {', '.join(tickers)}, what is the company's forward guidance from their Q{quarter} {year} earnings report?
 
 Focus on: revenue guidance, EPS guidance, growth expectations, or outlook for next quarter/year.
-Return ONLY a concise 1-2 sentence summary of the guidance. No preamble or explanation.
-If no specific guidance was provided, respond with exactly: NO_GUIDANCE"""
+Summarize each company's guidance in 1-2 concise sentences. If no specific guidance was provided, use exactly: NO_GUIDANCE
+Output ONLY a JSON array of objects like {{"ticker": "XYZ", "guidance": "..."}}. No preamble or explanation."""
             }
         ],
-        "max_tokens": 150
+        # ~150 tokens per ticker, as with the one-ticker prompt
+        "max_tokens": 150 * len(tickers)
     }
 
-    response = requests.post(
+    response = session.post(
         PERPLEXITY_API_URL,
         headers=headers,
         json=payload,
@@ -41,14 +47,26 @@ If no specific guidance was provided, respond with exactly: NO_GUIDANCE"""
     )
 
     print(f"Status: {response.status_code}")
-    data = response.json()
+    data = orjson.loads(response.content)
 
-    if "choices" in data:
-        guidance = data["choices"][0]["message"]["content"]
-        print(f"Response:\n{guidance}")
-    else:
+    if "choices" not in data:
         print(f"Full response:\n{data}")
+        return
+
+    content = data["choices"][0]["message"]["content"]
+    # The model sometimes wraps the array in a code fence or a sentence
+    start, end = content.find("["), content.rfind("]")
+    try:
+        results = orjson.loads(content[start:end + 1]) if start != -1 else None
+    except orjson.JSONDecodeError:
+        results = None
+
+    if not isinstance(results, list):
+        print(f"Could not parse JSON array, raw response:\n{content}")
+        return
+
+    for item in results:
+        print(f"{item.get('ticker', '?')}: {item.get('guidance', '')}")
 
-# Test both
-test_guidance("META", 4, 2025)
-test_guidance("TSLA", 4, 2025)
+# Test both in a single round trip
+test_guidance(["META", "TSLA"], 4, 2025)
@@ -5,6 +5,15 @@ Creates rich, visual embeds for Discord webhooks.
 
 from typing import Optional
 
+# Parts that are the same in every earnings embed. Embeds are only ever
+# serialized, never mutated, so the footer dict is shared between them.
+_EARNINGS_FOOTER = {"text": "EarningsBot • Data from Financial Modeling Prep"}
+_REVENUE_FIELD_NAME = "💰 Revenue"
+_EPS_FIELD_NAME = "📊 EPS"
+_GUIDANCE_FIELD_NAME = "🔮 Guidance"
+_TAKEAWAYS_FIELD_NAME = "📌 Key Takeaways"
+_BUY_PRICE_FIELD_NAME = "💲 Buy Below"
+
 
 def format_beat_miss(actual: float, estimate: float) -> str:
     """Return emoji indicator for beat/miss."""
@@ -17,6 +26,14 @@ def format_beat_miss(actual: float, estimate: float) -> str:
     return "➖"  # Met
 
 
+# (threshold, divisor, suffix) for format_number, largest first
+_SCALES = (
+    (1_000_000_000, 1_000_000_000, "B"),
+    (1_000_000, 1_000_000, "M"),
+    (1_000, 1_000, "K"),
+)
+
+
 def format_number(value: float, prefix: str = "$", suffix: str = "") -> str:
     """Format large numbers with B/M suffixes."""
     if value is None:
@@ -25,14 +42,10 @@ def format_number(value: float, prefix: str = "$", suffix: str = "") -> str:
     abs_value = abs(value)
     sign = "-" if value < 0 else ""
 
-    if abs_value >= 1_000_000_000:
-        return f"{sign}{prefix}{abs_value / 1_000_000_000:.2f}B{suffix}"
-    elif abs_value >= 1_000_000:
-        return f"{sign}{prefix}{abs_value / 1_000_000:.2f}M{suffix}"
-    elif abs_value >= 1_000:
-        return f"{sign}{prefix}{abs_value / 1_000:.2f}K{suffix}"
-    else:
-        return f"{sign}{prefix}{value:.2f}{suffix}"
+    for threshold, divisor, scale in _SCALES:
+        if abs_value >= threshold:
+            return f"{sign}{prefix}{abs_value / divisor:.2f}{scale}{suffix}"
+    return f"{sign}{prefix}{value:.2f}{suffix}"
 
 
 def format_percent_change(current: float, previous: float) -> str:
@@ -114,7 +127,7 @@ def create_earnings_embed(
         rev_est_str = f" (Est: {format_number(revenue_estimate)})" if revenue_estimate else ""
         rev_yoy = format_percent_change(revenue_actual, revenue_previous)
         fields.append({
-            "name": "💰 Revenue",
+            "name": _REVENUE_FIELD_NAME,
             "value": f"{format_number(revenue_actual)}{rev_est_str} {rev_indicator}{rev_yoy}",
             "inline": True
         })
@@ -125,7 +138,7 @@ def create_earnings_embed(
         eps_est_str = f" (Est: ${eps_estimate:.2f})" if eps_estimate else ""
         eps_yoy = format_percent_change(eps_actual, eps_previous)
         fields.append({
-            "name": "📊 EPS",
+            "name": _EPS_FIELD_NAME,
             "value": f"${eps_actual:.2f}{eps_est_str} {eps_indicator}{eps_yoy}",
             "inline": True
         })
@@ -133,7 +146,7 @@ def create_earnings_embed(
     # Guidance field (if available)
     if guidance:
         fields.append({
-            "name": "🔮 Guidance",
+            "name": _GUIDANCE_FIELD_NAME,
             "value": guidance,
             "inline": False
         })
@@ -142,7 +155,7 @@ def create_earnings_embed(
     if takeaways and len(takeaways) > 0:
         takeaways_text = "\n".join([f"• {t}" for t in takeaways])
         fields.append({
-            "name": "📌 Key Takeaways",
+            "name": _TAKEAWAYS_FIELD_NAME,
             "value": takeaways_text,
             "inline": False
         })
@@ -150,7 +163,7 @@ def create_earnings_embed(
     # Recommended buy price field (if available)
     if buy_price:
         fields.append({
-            "name": "💲 Buy Below",
+            "name": _BUY_PRICE_FIELD_NAME,
             "value": buy_price,
             "inline": False
         })
@@ -173,9 +186,7 @@ def create_earnings_embed(
         "description": description,
         "color": color,
         "fields": fields,
-        "footer": {
-            "text": "EarningsBot • Data from Financial Modeling Prep"
-        }
+        "footer": _EARNINGS_FOOTER
     }
 
     return embed
@@ -9,31 +9,48 @@ Usage:
     python earnings_bot.py              # Check yesterday's earnings
     python earnings_bot.py --date 2025-01-28  # Check specific date
     python earnings_bot.py --test       # Test with sample data
+    python earnings_bot.py --test --dry-run  # Print the sample embeds without posting
+    python earnings_bot.py --refresh    # Refetch cached guidance/takeaways/buy prices
+    python earnings_bot.py --verbose    # Also log each ticker's lookup details
+    python earnings_bot.py --force      # Repost even if nothing changed since the last post
 """
 
 import os
 import sys
 import re
-import json
 import argparse
-from datetime import datetime, timedelta
+import functools
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date as date_cls, datetime, timedelta
 from typing import Optional
+from zoneinfo import ZoneInfo
+import orjson
 import requests
 from dotenv import load_dotenv
-import pytz
 
-
-def strip_citations(text: str) -> str:
-    """Remove citation references like [1], [2][3], etc. from text."""
-    return re.sub(r'\[\d+\]', '', text).strip()
-
-from config import WATCHED_TICKERS, TIMEZONE
+from bots_common import (
+    CONNECT_TIMEOUT, SESSION, cache_get, cache_set, call_perplexity, prune_cache, set_log_level,
+    strip_citations,
+)
+from bots_common import fetch_stock_quotes_bulk as fetch_quotes_bulk
+from bots_common import post_to_discord as post_embeds
+from config import WATCHED_TICKERS, WATCHED_TICKERS_SET, TIMEZONE
 from discord_formatter import (
     create_earnings_embed,
     create_summary_embed,
-    create_no_earnings_embed
 )
 
+# Market timezone for "yesterday" and the current week
+_TZ = ZoneInfo(TIMEZONE)
+
+# All progress output goes through this logger; --verbose shows the detail
+# lines and LOG_LEVEL sets the threshold otherwise
+log = logging.getLogger(__name__)
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -42,57 +59,211 @@ FMP_API_KEY = os.getenv("FMP_API_KEY")
 DISCORD_WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL")
 PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
 FMP_STABLE_URL = "https://financialmodelingprep.com/stable"
-PERPLEXITY_API_URL = "https://api.perplexity.ai/chat/completions"
+
+# Company profiles (name etc.) are refetched at most this often
+PROFILE_CACHE_TTL = 30 * 24 * 3600
+
+# Reported quarter by announcement month, as (quarter, year offset):
+# Jan-Feb = Q4 of previous year, Mar-May = Q1, Jun-Aug = Q2, Sep-Nov = Q3, Dec = Q4
+FISCAL_QUARTER_BY_MONTH = (
+    None,
+    (4, -1), (4, -1),
+    (1, 0), (1, 0), (1, 0),
+    (2, 0), (2, 0), (2, 0),
+    (3, 0), (3, 0), (3, 0),
+    (4, 0),
+)
+
+# (connect, read) seconds for FMP requests; FMP answers in well under a second
+FMP_TIMEOUT = (CONNECT_TIMEOUT, 20)
+
+# Wall-clock budget for a run. Past it, Perplexity enrichment is skipped so
+# the report still posts with the FMP numbers instead of hitting the job timeout
+DEFAULT_DEADLINE_S = 180
+
+
+def _deadline_seconds() -> float:
+    """EARNINGSBOT_DEADLINE_S, or the default (with a warning) if it isn't a number."""
+    raw = os.getenv("EARNINGSBOT_DEADLINE_S", "")
+    if not raw:
+        return DEFAULT_DEADLINE_S
+    try:
+        return float(raw)
+    except ValueError:
+        log.warning("Warning: invalid EARNINGSBOT_DEADLINE_S %r, using %ss", raw, DEFAULT_DEADLINE_S)
+        return DEFAULT_DEADLINE_S
+
+
+RUN_DEADLINE = time.monotonic() + _deadline_seconds()
+
+# An all-time high close within this many days of the report counts as
+# hitting it "around" the report; history is read from PRICE_HISTORY_START
+ATH_WINDOW_DAYS = 3
+PRICE_HISTORY_START = "1980-01-01"
+
+# Max API calls in flight at once; each ticker needs ~7 independent lookups
+MAX_WORKERS = 8
+
+# Max tickers processed side by side
+TICKER_WORKERS = 4
+
+# How long Perplexity answers are reused from the disk cache: reported
+# numbers never change, market questions (ATH, buy price) hold for a day,
+# and "who reported when" lookups are refreshed a few times a day
+REPORT_CACHE_TTL = 365 * 24 * 3600
+DAY_CACHE_TTL = 24 * 3600
+LOOKUP_CACHE_TTL = 6 * 3600
+
+# FMP calendars for days before yesterday are settled and cached for good;
+# recent days still get actuals filled in, so they only live this long
+CALENDAR_CACHE_TTL = 3600
+
+# Cached calendars hold only watched entries, so the key carries the
+# watchlist; adding a ticker then refetches past ranges instead of serving
+# lists filtered without it
+_WATCHLIST_DIGEST = hashlib.blake2b("|".join(sorted(WATCHED_TICKERS_SET)).encode(), digest_size=8).hexdigest()
+
+# Insights without takeaways or a buy price usually mean Perplexity hadn't
+# indexed the report yet; those only count as cached for this long, so the
+# next run asks again instead of keeping the empty answer for good
+PARTIAL_INSIGHTS_TTL = 3600
+
+# Structured reply for fetch_earnings_insights
+INSIGHTS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "schema": {
+            "type": "object",
+            "properties": {
+                "guidance": {"type": "string"},
+                "takeaways": {"type": "array", "items": {"type": "string"}},
+                "buy_price": {"type": "string"}
+            },
+            "required": ["guidance", "takeaways", "buy_price"]
+        }
+    }
+}
+
+# Structured reply for verify_earnings_date_perplexity
+VERIFY_DATE_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "schema": {
+            "type": "object",
+            "properties": {
+                "last_reported_date": {"type": "string"},
+                "reported_on_date": {"type": "boolean"}
+            },
+            "required": ["last_reported_date", "reported_on_date"]
+        }
+    }
+}
+
+# Patterns for pulling values out of Perplexity's plain-text replies
+_ISO_DATE_RE = re.compile(r'(\d{4}-\d{2}-\d{2})')
+
+# "EPS_ACTUAL: 0.55" style lines, tolerating bullets, bold and "$" around
+# the label and value
+_EARNINGS_FIELD_RE = re.compile(
+    r'(EPS_ACTUAL|EPS_ESTIMATED|REVENUE_ACTUAL|REVENUE_ESTIMATED)[^:\n]*:[^\d\n-]*(-?[\d.,]+)',
+    re.IGNORECASE
+)
+_EARNINGS_FIELD_KEYS = {
+    "EPS_ACTUAL": "epsActual",
+    "EPS_ESTIMATED": "epsEstimated",
+    "REVENUE_ACTUAL": "revenueActual",
+    "REVENUE_ESTIMATED": "revenueEstimated",
+}
+
+# Any watched ticker as a whole word, so "S" doesn't match inside "SHOP"
+_WATCHED_TICKER_RE = re.compile(r'\b(' + '|'.join(re.escape(t) for t in WATCHED_TICKERS) + r')\b')
+
+# Perplexity requests currently running, keyed by what they ask for
+_INFLIGHT = {}
+_INFLIGHT_LOCK = threading.Lock()
 
 
 def get_yesterday_date() -> str:
     """Get yesterday's date in YYYY-MM-DD format, accounting for timezone."""
-    tz = pytz.timezone(TIMEZONE)
-    now = datetime.now(tz)
+    now = datetime.now(_TZ)
     yesterday = now - timedelta(days=1)
-    return yesterday.strftime("%Y-%m-%d")
+    return yesterday.date().isoformat()
 
 
-def fetch_earnings_calendar(date: str) -> list:
+def fmp_get(endpoint: str, params: dict, what: str):
     """
-    Fetch earnings calendar for a specific date.
-    Returns list of companies that reported earnings.
-    Uses the new stable API endpoint.
+    GET an FMP stable endpoint and return the decoded JSON, or None on
+    failure (logged as "Error fetching <what>"). Transient 429/5xx replies
+    have already been retried by the session by then.
     """
-    url = f"{FMP_STABLE_URL}/earnings-calendar"
-    params = {
-        "from": date,
-        "to": date,
-        "apikey": FMP_API_KEY
-    }
-
     try:
-        response = requests.get(url, params=params, timeout=30)
+        response = SESSION.get(f"{FMP_STABLE_URL}/{endpoint}", params={**params, "apikey": FMP_API_KEY},
+                               timeout=FMP_TIMEOUT)
         response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
-        print(f"Error fetching earnings calendar: {e}")
-        return []
+        return orjson.loads(response.content)
+    except (requests.RequestException, orjson.JSONDecodeError) as e:
+        log.warning("  Error fetching %s: %s", what, e)
+        return None
+
 
+def _first_row(data) -> Optional[dict]:
+    """Single-symbol FMP endpoints answer with a one-row list (or sometimes a bare object)."""
+    if isinstance(data, list) and data:
+        return data[0]
+    if isinstance(data, dict):
+        return data
+    return None
 
+
+def fetch_watched_earnings(start_date: str, end_date: Optional[str] = None) -> tuple[int, list]:
+    """
+    Fetch the earnings calendar for a date (or date range) and keep only
+    watched tickers in the same pass, so the full calendar is dropped as
+    soon as it's filtered.
+    Returns (total reports in the calendar, watched entries).
+    Uses the new stable API endpoint.
+    """
+    end_date = end_date or start_date
+    # Recent ranges are cached under their own key, so a snapshot taken before
+    # the actuals were in is never promoted to the permanent entry
+    settled = end_date < get_yesterday_date()
+    cache_key = f"{start_date}|{end_date}|{_WATCHLIST_DIGEST}"
+    if not settled:
+        cache_key += "|recent"
+    ttl = None if settled else CALENDAR_CACHE_TTL
+    cached = cache_get("fmp_calendar", cache_key, ttl)
+    if cached is not None:
+        total, watched = cached
+        return total, watched
+
+    calendar = fmp_get("earnings-calendar", {"from": start_date, "to": end_date}, "earnings calendar")
+    if calendar is None:
+        return 0, []
+
+    # FMP reports plan/key errors as a JSON object instead of a list
+    if not isinstance(calendar, list):
+        log.warning("Unexpected earnings calendar response: %s", calendar)
+        return 0, []
+
+    total, watched = len(calendar), filter_watched_earnings(calendar)
+    cache_set("fmp_calendar", cache_key, [total, watched])
+    return total, watched
+
+
+@functools.lru_cache(maxsize=512)
 def fetch_company_profile(ticker: str) -> Optional[dict]:
-    """Fetch company profile for name and details."""
-    # Try stable API first, fall back to legacy
-    url = f"{FMP_STABLE_URL}/profile"
-    params = {"symbol": ticker, "apikey": FMP_API_KEY}
+    """
+    Fetch company profile for name and details.
+    Profiles barely change, so they are cached on disk for PROFILE_CACHE_TTL.
+    """
+    cached = cache_get("fmp_profile", ticker, PROFILE_CACHE_TTL)
+    if cached is not None:
+        return cached
 
-    try:
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        if isinstance(data, list) and data:
-            return data[0]
-        elif isinstance(data, dict):
-            return data
-        return None
-    except requests.RequestException as e:
-        print(f"Error fetching profile for {ticker}: {e}")
-        return None
+    profile = _first_row(fmp_get("profile", {"symbol": ticker}, f"profile for {ticker}"))
+    if profile is not None:
+        cache_set("fmp_profile", ticker, profile)
+    return profile
 
 
 def fetch_stock_quote(ticker: str) -> Optional[dict]:
@@ -101,21 +272,12 @@ def fetch_stock_quote(ticker: str) -> Optional[dict]:
     Returns dict with price, change, changesPercentage, and
     pre/after-market fields if available.
     """
-    url = f"{FMP_STABLE_URL}/quote"
-    params = {"symbol": ticker, "apikey": FMP_API_KEY}
+    return _first_row(fmp_get("quote", {"symbol": ticker}, f"quote for {ticker}"))
 
-    try:
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        if isinstance(data, list) and data:
-            return data[0]
-        elif isinstance(data, dict):
-            return data
-        return None
-    except requests.RequestException as e:
-        print(f"Error fetching quote for {ticker}: {e}")
-        return None
+
+def fetch_stock_quotes_bulk(tickers: list) -> dict:
+    """Fetch quotes for several tickers (see bots_common.fetch_stock_quotes_bulk)."""
+    return fetch_quotes_bulk(tickers, FMP_API_KEY)
 
 
 def get_stock_change_percent(quote: dict) -> tuple[Optional[float], str]:
@@ -146,222 +308,291 @@ def get_stock_change_percent(quote: dict) -> tuple[Optional[float], str]:
 
 
 def fetch_earnings_history(ticker: str, limit: int = 8) -> list:
-    """Fetch historical earnings for YoY comparison."""
-    url = f"{FMP_STABLE_URL}/earnings"
-    params = {"symbol": ticker, "limit": limit, "apikey": FMP_API_KEY}
-    try:
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        return data if isinstance(data, list) else []
-    except requests.RequestException as e:
-        print(f"  Error fetching earnings history for {ticker}: {e}")
+    """
+    Fetch historical earnings for YoY comparison.
+    Past quarters don't change, so the list is cached on disk for a day
+    (long enough for reruns, short enough to pick up the latest report).
+    """
+    cache_key = f"{ticker}|{limit}"
+    cached = cache_get("fmp_earnings_history", cache_key, DAY_CACHE_TTL)
+    if cached is not None:
+        return cached
+
+    data = fmp_get("earnings", {"symbol": ticker, "limit": limit}, f"earnings history for {ticker}")
+    if not isinstance(data, list):
         return []
+    cache_set("fmp_earnings_history", cache_key, data)
+    return data
 
 
-def fetch_earnings_guidance(ticker: str, year: int, quarter: int) -> Optional[str]:
+def _out_of_time() -> bool:
+    """True once the run has used up its EARNINGSBOT_DEADLINE_S budget."""
+    return time.monotonic() > RUN_DEADLINE
+
+
+def _single_flight(key: tuple, func, *args):
     """
-    Fetch earnings guidance using Perplexity AI to search recent news.
-    Much more cost-effective than FMP transcripts (~$0.006 per query).
+    Call func(*args), unless a call with the same key is already running;
+    then wait for that call and return its result instead of repeating it.
     """
-    if not PERPLEXITY_API_KEY:
-        return None
+    with _INFLIGHT_LOCK:
+        future = _INFLIGHT.get(key)
+        owner = future is None
+        if owner:
+            future = _INFLIGHT[key] = Future()
+
+    if not owner:
+        return future.result()
 
     try:
-        headers = {
-            "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
-            "Content-Type": "application/json"
-        }
+        result = func(*args)
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _INFLIGHT_LOCK:
+            del _INFLIGHT[key]
 
-        payload = {
-            "model": "sonar",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": f"""What is {ticker}'s forward guidance from their Q{quarter} {year} earnings report?
-
-Focus on: revenue guidance, EPS guidance, growth expectations, or outlook for next quarter/year.
-Return ONLY a concise 1-2 sentence summary of the guidance. No preamble or explanation.
-If no specific guidance was provided, respond with exactly: NO_GUIDANCE"""
-                }
-            ],
-            "max_tokens": 150
-        }
 
-        response = requests.post(
-            PERPLEXITY_API_URL,
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
-        response.raise_for_status()
+def fetch_earnings_insights(ticker: str, year: int, quarter: int, current_price: Optional[float] = None,
+                            force_refresh: bool = False) -> tuple[Optional[str], Optional[list], Optional[str]]:
+    """
+    Fetch forward guidance, 3 key takeaways and a recommended buy price for
+    one earnings report using a single Perplexity AI query (~$0.006) with a
+    JSON reply. The buy price considers earnings results, growth, valuation,
+    and forward guidance.
+    A past quarter's report doesn't change, so answers are cached on disk
+    with no expiry; force_refresh skips the cache and overwrites it.
+    Concurrent calls for the same report share one request.
+    Returns (guidance, takeaways, buy_price); each is None if unavailable.
+    """
+    return _single_flight(
+        ("earnings_insights", ticker, year, quarter, force_refresh),
+        _fetch_earnings_insights, ticker, year, quarter, current_price, force_refresh
+    )
 
-        data = response.json()
-        guidance = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-        guidance = strip_citations(guidance)
 
-        # Return default message if no guidance found
-        if not guidance or "NO_GUIDANCE" in guidance.upper():
-            return "No guidance provided"
+def _cached_insights(cache_key: str) -> Optional[dict]:
+    """Return the cached insights for cache_key, ignoring stale partial answers."""
+    cached = cache_get("earnings_insights", cache_key)
+    if cached and not (cached.get("takeaways") and cached.get("buy_price")):
+        cached = cache_get("earnings_insights", cache_key, PARTIAL_INSIGHTS_TTL)
+    return cached
 
-        return guidance
 
-    except Exception as e:
-        print(f"  Error fetching guidance for {ticker}: {e}")
-        return None
+def _store_insights(cache_key: str, result: dict,
+                    keep_partial: bool = True) -> tuple[Optional[str], Optional[list], Optional[str]]:
+    """
+    Clean up one report's parsed insights reply and cache it under cache_key.
+    With keep_partial unset, a reply missing takeaways or a buy price is
+    returned but not cached.
+    """
+    # Return default message if no guidance found
+    guidance = strip_citations(str(result.get("guidance") or ""))
+    if not guidance or "NO_GUIDANCE" in guidance.upper():
+        guidance = "No guidance provided"
+
+    # Strip citations and any bullet characters the model added anyway
+    takeaways = []
+    for item in result.get("takeaways") or []:
+        takeaway = strip_citations(str(item).strip().lstrip("•-* "))
+        if takeaway:
+            takeaways.append(takeaway)
+    takeaways = takeaways[:3] if takeaways else None
+
+    # Anything longer than a price is the model explaining itself
+    buy_price = strip_citations(str(result.get("buy_price") or ""))
+    if not buy_price or len(buy_price) > 50:
+        buy_price = None
+
+    if keep_partial or (takeaways and buy_price):
+        cache_set("earnings_insights", cache_key, {
+            "guidance": guidance,
+            "takeaways": takeaways,
+            "buy_price": buy_price
+        })
+    return guidance, takeaways, buy_price
 
 
-def fetch_key_takeaways(ticker: str, year: int, quarter: int) -> Optional[list]:
+def fetch_earnings_insights_bulk(reports: list, force_refresh: bool = False) -> set:
     """
-    Fetch 3 key takeaways from earnings report using Perplexity AI.
+    Fetch insights for several earnings reports with one Perplexity query
+    and store each in the cache fetch_earnings_insights reads.
+    reports is a list of (ticker, year, quarter, current_price). Reports
+    already cached are left out unless force_refresh is set.
+    Returns the tickers whose insights were fetched; the rest are left to
+    fetch_earnings_insights.
     """
     if not PERPLEXITY_API_KEY:
-        return None
+        return set()
+
+    if not force_refresh:
+        uncached = [r for r in reports if _cached_insights(f"{r[0]}|{r[1]}|{r[2]}") is None]
+        log.info("  Insights cache: %s hit(s), %s miss(es)", len(reports) - len(uncached), len(uncached))
+        reports = uncached
+    # A single report gains nothing from the bulk prompt
+    if len(reports) < 2:
+        return set()
+
+    report_lines = "\n".join(
+        f"- {ticker}: Q{quarter} {year} report"
+        + (f" (the stock currently trades at ${price:.2f})" if price else "")
+        for ticker, year, quarter, price in reports
+    )
+    tickers = [r[0] for r in reports]
+
+    prompt = f"""For each of these earnings reports:
+{report_lines}
+
+give, under the ticker's key:
+1. guidance: the forward guidance as a concise 1-2 sentence summary. Focus on revenue guidance, EPS guidance, growth expectations, or outlook for next quarter/year. If no specific guidance was provided, use exactly: NO_GUIDANCE
+2. takeaways: the 3 most important takeaways, each 1 sentence. Focus on significant business developments, growth metrics, challenges, strategic initiatives, or notable commentary.
+3. buy_price: the maximum price you would recommend buying at, as a single price (e.g. "$150.00"). Consider the earnings results, revenue growth, EPS trends, forward guidance, and valuation. No range.
+
+No preamble, numbering, explanation, or disclaimers."""
+
+    insights_schema = INSIGHTS_RESPONSE_FORMAT["json_schema"]["schema"]
+    response_format = {
+        "type": "json_schema",
+        "json_schema": {
+            "schema": {
+                "type": "object",
+                "properties": {ticker: insights_schema for ticker in tickers},
+                "required": tickers
+            }
+        }
+    }
 
     try:
-        headers = {
-            "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
-            "Content-Type": "application/json"
-        }
+        content = call_perplexity(prompt, max_tokens=400 * len(reports), timeout=60,
+                                  response_format=response_format)
+        result = orjson.loads(content)
+    except Exception as e:
+        log.warning("  Error fetching bulk earnings insights: %s", e)
+        return set()
 
-        payload = {
-            "model": "sonar",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": f"""What are the 3 most important takeaways from {ticker}'s Q{quarter} {year} earnings report?
-
-Focus on: significant business developments, growth metrics, challenges, strategic initiatives, or notable commentary.
-Return ONLY 3 bullet points, each 1 sentence. No preamble, numbering, or explanation.
-Format exactly like:
-• First takeaway
-• Second takeaway
-• Third takeaway"""
-                }
-            ],
-            "max_tokens": 250
-        }
+    fetched = set()
+    for ticker, year, quarter, _ in reports:
+        entry = result.get(ticker) if isinstance(result, dict) else None
+        if not isinstance(entry, dict):
+            continue
+        # "NO_GUIDANCE" alone is not an answer; incomplete entries are left
+        # to the single-report query instead of being cached
+        _, takeaways, buy_price = _store_insights(f"{ticker}|{year}|{quarter}", entry, keep_partial=False)
+        if takeaways and buy_price:
+            fetched.add(ticker)
+    log.info("  Bulk insights covered %s/%s report(s)", len(fetched), len(reports))
+    return fetched
 
-        response = requests.post(
-            PERPLEXITY_API_URL,
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
-        response.raise_for_status()
 
-        data = response.json()
-        content = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+def _fetch_earnings_insights(ticker: str, year: int, quarter: int, current_price: Optional[float],
+                             force_refresh: bool) -> tuple[Optional[str], Optional[list], Optional[str]]:
+    if not PERPLEXITY_API_KEY:
+        return None, None, None
+
+    cache_key = f"{ticker}|{year}|{quarter}"
+    if not force_refresh:
+        cached = _cached_insights(cache_key)
+        if cached is not None:
+            return cached["guidance"], cached["takeaways"], cached["buy_price"]
 
-        # Parse bullet points and strip citations
-        takeaways = []
-        for line in content.split("\n"):
-            line = line.strip()
-            if line.startswith("•") or line.startswith("-") or line.startswith("*"):
-                takeaway = line.lstrip("•-* ").strip()
-                takeaway = strip_citations(takeaway)
-                if takeaway:
-                    takeaways.append(takeaway)
+    try:
+        price_context = f"The stock currently trades at ${current_price:.2f}. " if current_price else ""
+
+        prompt = f"""For {ticker}'s Q{quarter} {year} earnings report, give:
+
+1. guidance: the forward guidance as a concise 1-2 sentence summary. Focus on revenue guidance, EPS guidance, growth expectations, or outlook for next quarter/year. If no specific guidance was provided, use exactly: NO_GUIDANCE
+2. takeaways: the 3 most important takeaways, each 1 sentence. Focus on significant business developments, growth metrics, challenges, strategic initiatives, or notable commentary.
+3. buy_price: the maximum price you would recommend buying at, as a single price (e.g. "$150.00"). {price_context}Consider the earnings results, revenue growth, EPS trends, forward guidance, and valuation. No range.
+
+No preamble, numbering, explanation, or disclaimers."""
 
-        return takeaways[:3] if takeaways else None
+        content = call_perplexity(prompt, max_tokens=500, timeout=30, response_format=INSIGHTS_RESPONSE_FORMAT)
+        return _store_insights(cache_key, orjson.loads(content))
 
     except Exception as e:
-        print(f"  Error fetching takeaways for {ticker}: {e}")
-        return None
+        log.warning("  Error fetching earnings insights for %s: %s", ticker, e)
+        return None, None, None
 
 
-def fetch_recommended_buy_price(ticker: str, year: int, quarter: int, current_price: Optional[float] = None) -> Optional[str]:
+def fetch_price_history(ticker: str, start_date: str, end_date: str) -> list:
     """
-    Fetch a recommended buy price using Perplexity AI after earnings report.
-    Considers earnings results, growth, valuation, and forward guidance.
+    Fetch daily closing prices (oldest first is not guaranteed) from FMP's
+    light end-of-day endpoint.
+    Returns a list of {"date", "price"/"close"} rows, or [] on failure.
     """
-    if not PERPLEXITY_API_KEY:
-        return None
+    data = fmp_get("historical-price-eod/light", {"symbol": ticker, "from": start_date, "to": end_date},
+                   f"price history for {ticker}")
+    return data if isinstance(data, list) else []
 
-    try:
-        headers = {
-            "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
-            "Content-Type": "application/json"
-        }
 
-        price_context = f"The stock currently trades at ${current_price:.2f}. " if current_price else ""
+def check_all_time_high(ticker: str, date: str) -> bool:
+    """
+    Check if stock hit an all-time high on or around the given date.
+    Computed from FMP's daily closes: the highest close on record up to a
+    few days past date has to fall within ATH_WINDOW_DAYS of it. Falls back
+    to asking Perplexity when FMP has no price history for the ticker.
+    """
+    # Without a date the question has no useful answer
+    if not date:
+        return False
 
-        payload = {
-            "model": "sonar",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": f"""Based on {ticker}'s Q{quarter} {year} earnings results, what is the maximum price you would recommend buying at?
-
-{price_context}Consider the earnings results, revenue growth, EPS trends, forward guidance, and valuation.
-Return ONLY a single price number (e.g. "$150.00"). No range, no explanation, no preamble, no disclaimers. Just the price."""
-                }
-            ],
-            "max_tokens": 50
-        }
+    cached = cache_get("all_time_high", f"{ticker}|{date}", DAY_CACHE_TTL)
+    if cached is not None:
+        return cached
 
-        response = requests.post(
-            PERPLEXITY_API_URL,
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
-        response.raise_for_status()
+    try:
+        target = date_cls.fromisoformat(date)
+    except ValueError:
+        return False
 
-        data = response.json()
-        buy_price = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-        buy_price = strip_citations(buy_price)
+    window_end = (target + timedelta(days=ATH_WINDOW_DAYS)).isoformat()
+    history = fetch_price_history(ticker, PRICE_HISTORY_START, window_end)
 
-        if not buy_price or len(buy_price) > 50:
-            return None
+    try:
+        best_date, best_close = None, None
+        for row in history:
+            if not isinstance(row, dict):
+                continue
+            close = row.get("price", row.get("close"))
+            # Null or string closes show up in FMP's data; skip them
+            if not isinstance(close, (int, float)) or isinstance(close, bool):
+                continue
+            row_date = (row.get("date") or "")[:10]
+            if row_date and (best_close is None or close > best_close):
+                best_date, best_close = row_date, close
 
-        return buy_price
+        if best_date is None:
+            return _check_all_time_high_perplexity(ticker, date)
 
-    except Exception as e:
-        print(f"  Error fetching buy price for {ticker}: {e}")
-        return None
+        is_ath = abs((date_cls.fromisoformat(best_date) - target).days) <= ATH_WINDOW_DAYS
+    except (TypeError, ValueError, KeyError) as e:
+        # Bad rows mustn't take the whole run (and its Discord post) down
+        log.warning("  Error checking ATH for %s: %s", ticker, e)
+        return False
 
+    cache_set("all_time_high", f"{ticker}|{date}", is_ath)
+    return is_ath
 
-def check_all_time_high(ticker: str, date: str) -> bool:
-    """
-    Check if stock hit an all-time high on the given date using Perplexity.
-    """
+
+def _check_all_time_high_perplexity(ticker: str, date: str) -> bool:
+    """Ask Perplexity whether the stock hit an all-time high around date."""
     if not PERPLEXITY_API_KEY:
         return False
 
     try:
-        headers = {
-            "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        payload = {
-            "model": "sonar",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": f"""Did {ticker} stock reach an all-time high on or around {date}?
+        prompt = f"""Did {ticker} stock reach an all-time high on or around {date}?
 Answer ONLY with YES or NO. Nothing else."""
-                }
-            ],
-            "max_tokens": 10
-        }
-
-        response = requests.post(
-            PERPLEXITY_API_URL,
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
-        response.raise_for_status()
 
-        data = response.json()
-        answer = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip().upper()
+        answer = call_perplexity(prompt, max_tokens=10, timeout=30, cache_ttl=DAY_CACHE_TTL).upper()
 
         return "YES" in answer
 
     except Exception as e:
-        print(f"  Error checking ATH for {ticker}: {e}")
+        log.warning("  Error checking ATH for %s: %s", ticker, e)
         return False
 
 
@@ -375,7 +606,7 @@ def get_previous_year_earnings(ticker: str, announcement_date: str) -> Optional[
         return None
 
     try:
-        current_dt = datetime.strptime(announcement_date, "%Y-%m-%d")
+        current_dt = date_cls.fromisoformat(announcement_date)
         target_dt = current_dt.replace(year=current_dt.year - 1)
     except (ValueError, TypeError):
         return None
@@ -388,7 +619,7 @@ def get_previous_year_earnings(ticker: str, announcement_date: str) -> Optional[
         if not date_str:
             continue
         try:
-            entry_dt = datetime.strptime(date_str[:10], "%Y-%m-%d")
+            entry_dt = date_cls.fromisoformat(date_str[:10])
             diff = abs((entry_dt - target_dt).days)
             if diff < best_diff:
                 best_diff = diff
@@ -402,8 +633,8 @@ def get_previous_year_earnings(ticker: str, announcement_date: str) -> Optional[
 
 def filter_watched_earnings(earnings_calendar: list) -> list:
     """Filter earnings calendar to only include watched tickers."""
-    watched_set = set(ticker.upper() for ticker in WATCHED_TICKERS)
-    return [e for e in earnings_calendar if e.get("symbol", "").upper() in watched_set]
+    # Rows without a symbol are skipped before any string work
+    return [e for e in earnings_calendar if (symbol := e.get("symbol")) and symbol.upper() in WATCHED_TICKERS_SET]
 
 
 def fetch_earnings_data_perplexity(ticker: str, date: str) -> dict:
@@ -416,17 +647,7 @@ def fetch_earnings_data_perplexity(ticker: str, date: str) -> dict:
         return {}
 
     try:
-        headers = {
-            "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        payload = {
-            "model": "sonar",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": f"""What were {ticker}'s earnings results reported on {date}?
+        prompt = f"""What were {ticker}'s earnings results reported on {date}?
 
 I need these 4 numbers:
 1. Actual EPS (adjusted/non-GAAP)
@@ -441,147 +662,68 @@ REVENUE_ACTUAL: 900000000
 REVENUE_ESTIMATED: 880000000
 
 No explanations. Just the 4 lines."""
-                }
-            ],
-            "max_tokens": 150
-        }
 
-        response = requests.post(
-            PERPLEXITY_API_URL,
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
-        response.raise_for_status()
-
-        data = response.json()
-        content = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-        content = strip_citations(content)
-        print(f"  Perplexity earnings data for {ticker}: {content}")
+        content = call_perplexity(prompt, max_tokens=150, timeout=30, cache_ttl=REPORT_CACHE_TTL)
+        log.debug("  Perplexity earnings data for %s: %s", ticker, content)
 
         result = {}
-        for line in content.split("\n"):
-            line = line.strip()
+        for match in _EARNINGS_FIELD_RE.finditer(content):
             try:
-                if "EPS_ACTUAL" in line.upper():
-                    val = re.search(r'[-]?[\d.]+', line.split(":")[-1])
-                    if val:
-                        result["epsActual"] = float(val.group())
-                elif "EPS_ESTIMATED" in line.upper():
-                    val = re.search(r'[-]?[\d.]+', line.split(":")[-1])
-                    if val:
-                        result["epsEstimated"] = float(val.group())
-                elif "REVENUE_ACTUAL" in line.upper():
-                    val = re.search(r'[\d.]+', line.split(":")[-1].replace(",", ""))
-                    if val:
-                        result["revenueActual"] = float(val.group())
-                elif "REVENUE_ESTIMATED" in line.upper():
-                    val = re.search(r'[\d.]+', line.split(":")[-1].replace(",", ""))
-                    if val:
-                        result["revenueEstimated"] = float(val.group())
-            except (ValueError, IndexError):
+                result[_EARNINGS_FIELD_KEYS[match.group(1).upper()]] = float(match.group(2).replace(",", ""))
+            except ValueError:
                 continue
 
         return result
 
     except Exception as e:
-        print(f"  Error fetching earnings data for {ticker}: {e}")
+        log.warning("  Error fetching earnings data for %s: %s", ticker, e)
         return {}
 
 
 def verify_earnings_date_perplexity(ticker: str, date: str) -> bool:
     """
     Verify with Perplexity that a specific ticker actually reported earnings on a date.
-    Uses two checks:
-    1. Ask for the actual earnings date and compare (most reliable)
-    2. If the date returned is old (Perplexity index lag), try a direct YES/NO as backup
-    Only confirms if at least one check passes AND the earnings data query succeeds.
+    One prompt asks for both:
+    1. The ticker's most recent earnings date, compared against date (most reliable)
+    2. A direct yes/no for date, trusted only when the last known date is
+       30-120 days earlier (Perplexity index lag for a report that just came out)
     """
     if not PERPLEXITY_API_KEY:
         return False
 
     try:
-        headers = {
-            "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
-            "Content-Type": "application/json"
-        }
+        prompt = f"""For {ticker}, give:
+1. last_reported_date: the date it most recently reported quarterly earnings results, in YYYY-MM-DD format.
+2. reported_on_date: whether it released its quarterly earnings report on exactly {date}. If you cannot confirm earnings were released on exactly {date}, use false."""
 
-        # Step 1: Ask for the actual most recent earnings date
-        payload = {
-            "model": "sonar",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": f"""What date did {ticker} most recently report its quarterly earnings results?
-Return ONLY the date in YYYY-MM-DD format. Nothing else."""
-                }
-            ],
-            "max_tokens": 20
-        }
+        content = call_perplexity(prompt, max_tokens=50, timeout=30, cache_ttl=LOOKUP_CACHE_TTL,
+                                  response_format=VERIFY_DATE_RESPONSE_FORMAT)
+        result = orjson.loads(content)
 
-        response = requests.post(
-            PERPLEXITY_API_URL,
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
-        response.raise_for_status()
-
-        data = response.json()
-        answer = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-        answer = strip_citations(answer)
+        date_match = _ISO_DATE_RE.search(str(result.get("last_reported_date") or ""))
+        if not date_match:
+            return False
 
-        # Extract date from response
-        date_match = re.search(r'(\d{4}-\d{2}-\d{2})', answer)
-        if date_match:
-            reported_date = date_match.group(1)
-            if reported_date == date:
-                print(f"    {ticker}: confirmed earnings on {date}")
-                return True
+        reported_date = date_match.group(1)
+        if reported_date == date:
+            log.info("    %s: confirmed earnings on %s", ticker, date)
+            return True
 
-            # If Perplexity returned an old date (index lag for today's earnings),
-            # check if the returned date is significantly before our target date
-            try:
-                target = datetime.strptime(date, "%Y-%m-%d")
-                returned = datetime.strptime(reported_date, "%Y-%m-%d")
-                days_diff = (target - returned).days
-
-                # If the last known earnings was 30-120 days ago, this ticker
-                # could be reporting again now (quarterly cadence)
-                if 30 <= days_diff <= 120:
-                    # Do a YES/NO backup check with very specific prompt
-                    backup_payload = {
-                        "model": "sonar",
-                        "messages": [
-                            {
-                                "role": "user",
-                                "content": f"""Did {ticker} release its quarterly earnings report on exactly {date}?
-I know their previous earnings were on {reported_date}. I am asking specifically about {date}.
-If you cannot confirm earnings were released on exactly {date}, answer NO.
-Answer ONLY YES or NO."""
-                            }
-                        ],
-                        "max_tokens": 10
-                    }
-                    backup_response = requests.post(
-                        PERPLEXITY_API_URL,
-                        headers=headers,
-                        json=backup_payload,
-                        timeout=30
-                    )
-                    backup_response.raise_for_status()
-                    backup_answer = backup_response.json().get("choices", [{}])[0].get("message", {}).get("content", "").strip().upper()
-                    backup_answer = strip_citations(backup_answer)
-                    if "YES" in backup_answer:
-                        print(f"    {ticker}: backup check confirmed earnings on {date} (last known: {reported_date})")
-                        return True
-            except ValueError:
-                pass
+        # If Perplexity returned an old date (index lag for today's earnings),
+        # fall back to the yes/no answer, but only if the last known earnings
+        # was 30-120 days before our target date (quarterly cadence)
+        try:
+            days_diff = (date_cls.fromisoformat(date) - date_cls.fromisoformat(reported_date)).days
+        except ValueError:
+            return False
+        if 30 <= days_diff <= 120 and result.get("reported_on_date") is True:
+            log.info("    %s: backup check confirmed earnings on %s (last known: %s)", ticker, date, reported_date)
+            return True
 
         return False
 
     except Exception as e:
-        print(f"  Error verifying earnings date for {ticker}: {e}")
+        log.warning("  Error verifying earnings date for %s: %s", ticker, e)
         return False
 
 
@@ -598,7 +740,8 @@ def fetch_missing_earnings_perplexity(date: str, already_found: list) -> list:
 
     # Determine which watched tickers FMP already found
     found_set = set(e.get("symbol", "").upper() for e in already_found)
-    missing_tickers = [t for t in WATCHED_TICKERS if t.upper() not in found_set]
+    # Config tickers are already uppercase
+    missing_tickers = [t for t in WATCHED_TICKERS if t not in found_set]
 
     if not missing_tickers:
         return []
@@ -606,48 +749,24 @@ def fetch_missing_earnings_perplexity(date: str, already_found: list) -> list:
     ticker_list = ", ".join(missing_tickers)
 
     try:
-        headers = {
-            "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
-            "Content-Type": "application/json"
-        }
-
         # Single bulk query to identify which tickers reported on the date
-        print(f"  Bulk checking {len(missing_tickers)} tickers in one query...")
-        payload = {
-            "model": "sonar",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": f"""Which of these stocks reported quarterly earnings on {date}?
+        log.info("  Bulk checking %s tickers in one query...", len(missing_tickers))
+        prompt = f"""Which of these stocks reported quarterly earnings on {date}?
 
 {ticker_list}
 
 List ONLY the ticker symbols that reported earnings on exactly {date}.
 If none reported on that date, respond with: NONE
 Return ONLY the ticker symbols, one per line, nothing else."""
-                }
-            ],
-            "max_tokens": 200
-        }
-
-        response = requests.post(
-            PERPLEXITY_API_URL,
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
-        response.raise_for_status()
 
-        data = response.json()
-        content = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-        content = strip_citations(content)
-        print(f"  Perplexity bulk response: {content}")
+        content = call_perplexity(prompt, max_tokens=200, timeout=30, cache_ttl=LOOKUP_CACHE_TTL)
+        log.debug("  Perplexity bulk response: %s", content)
 
         if "NONE" in content.upper() and len(content) < 20:
             return []
 
         # Extract ticker symbols from the response
-        watched_upper = set(t.upper() for t in missing_tickers)
+        watched_upper = set(missing_tickers)
         candidates = []
         for line in content.split("\n"):
             token = line.strip().upper().lstrip("•-*0123456789.) ")
@@ -658,16 +777,17 @@ Return ONLY the ticker symbols, one per line, nothing else."""
         if not candidates:
             return []
 
-        print(f"  {len(candidates)} candidate(s) identified: {', '.join(candidates)}")
+        log.info("  %s candidate(s) identified: %s", len(candidates), ', '.join(candidates))
 
-        # Fetch earnings data for confirmed candidates only
-        all_found = []
-        for ticker in candidates:
-            print(f"  Fetching earnings data for {ticker} via Perplexity...")
-            earnings_data = fetch_earnings_data_perplexity(ticker, date)
+        # Fetch earnings data for confirmed candidates only, all at once
+        log.info("  Fetching earnings data for %s via Perplexity...", ', '.join(candidates))
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            results = list(pool.map(lambda t: fetch_earnings_data_perplexity(t, date), candidates))
 
+        all_found = []
+        for ticker, earnings_data in zip(candidates, results):
             if earnings_data.get("epsActual") is not None:
-                print(f"  ✅ {ticker} confirmed with data")
+                log.info("  ✅ %s confirmed with data", ticker)
                 all_found.append({
                     "symbol": ticker,
                     "date": date,
@@ -677,12 +797,12 @@ Return ONLY the ticker symbols, one per line, nothing else."""
                     "revenueEstimated": earnings_data.get("revenueEstimated"),
                 })
             else:
-                print(f"  ⚠️ {ticker} - could not fetch earnings data, skipping")
+                log.warning("  ⚠️ %s - could not fetch earnings data, skipping", ticker)
 
         return all_found
 
     except Exception as e:
-        print(f"  Error in Perplexity earnings check: {e}")
+        log.warning("  Error in Perplexity earnings check: %s", e)
         return []
 
 
@@ -696,7 +816,8 @@ def fetch_missing_weekly_earnings_perplexity(start_date: str, end_date: str, alr
         return []
 
     found_set = set(e.get("symbol", "").upper() for e in already_found)
-    missing_tickers = [t for t in WATCHED_TICKERS if t.upper() not in found_set]
+    # Config tickers are already uppercase
+    missing_tickers = [t for t in WATCHED_TICKERS if t not in found_set]
 
     if not missing_tickers:
         return []
@@ -704,60 +825,35 @@ def fetch_missing_weekly_earnings_perplexity(start_date: str, end_date: str, alr
     ticker_list = ", ".join(missing_tickers)
 
     try:
-        headers = {
-            "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        payload = {
-            "model": "sonar",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": f"""Which of these stocks are scheduled to report their quarterly earnings between {start_date} and {end_date} (inclusive)?
+        prompt = f"""Which of these stocks are scheduled to report their quarterly earnings between {start_date} and {end_date} (inclusive)?
 
 {ticker_list}
 
 Search for each ticker's next earnings date. Only include tickers with earnings dates that fall within {start_date} to {end_date}.
 For each match, return the format: TICKER:YYYY-MM-DD (one per line).
 If none of them report during this period, respond with: NONE"""
-                }
-            ],
-            "max_tokens": 500
-        }
-
-        response = requests.post(
-            PERPLEXITY_API_URL,
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
-        response.raise_for_status()
 
-        data = response.json()
-        content = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-        content = strip_citations(content)
-        print(f"  Perplexity weekly response: {content}")
+        content = call_perplexity(prompt, max_tokens=500, timeout=30, cache_ttl=LOOKUP_CACHE_TTL)
+        log.debug("  Perplexity weekly response: %s", content)
 
         if "NONE" in content.upper() and len(content) < 20:
             return []
 
         # Parse TICKER:DATE format from response
         all_found = []
-        watched_upper = set(t.upper() for t in missing_tickers)
 
         for line in content.split("\n"):
             line = line.strip().lstrip("•-*0123456789.) ")
             # Try to extract a ticker and date from each line
-            date_match = re.search(r'(\d{4}-\d{2}-\d{2})', line)
+            date_match = _ISO_DATE_RE.search(line)
             if not date_match:
                 continue
             report_date = date_match.group(1)
 
-            # Check which ticker this line is about
-            for ticker in missing_tickers:
-                # Use word boundary matching to avoid "S" matching "SHOP"
-                if re.search(r'\b' + re.escape(ticker.upper()) + r'\b', line.upper()) and ticker.upper() not in found_set:
+            # Check which tickers this line is about; FMP-found and already
+            # matched tickers are in found_set
+            for ticker in _WATCHED_TICKER_RE.findall(line.upper()):
+                if ticker not in found_set:
                     all_found.append({
                         "symbol": ticker,
                         "date": report_date,
@@ -766,33 +862,13 @@ If none of them report during this period, respond with: NONE"""
                         "revenueActual": None,
                         "revenueEstimated": None,
                     })
-                    found_set.add(ticker.upper())
-                    print(f"  Perplexity fallback found: {ticker} reporting on {report_date}")
+                    found_set.add(ticker)
+                    log.info("  Perplexity fallback found: %s reporting on %s", ticker, report_date)
 
         return all_found
 
     except Exception as e:
-        print(f"  Error in Perplexity weekly earnings check: {e}")
-        return []
-
-
-def fetch_week_earnings(start_date: str, end_date: str) -> list:
-    """
-    Fetch earnings calendar for a date range (week).
-    """
-    url = f"{FMP_STABLE_URL}/earnings-calendar"
-    params = {
-        "from": start_date,
-        "to": end_date,
-        "apikey": FMP_API_KEY
-    }
-
-    try:
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
-        print(f"Error fetching earnings calendar: {e}")
+        log.warning("  Error in Perplexity weekly earnings check: %s", e)
         return []
 
 
@@ -813,7 +889,7 @@ def create_weekly_preview_embed(upcoming_earnings: list) -> dict:
         tickers = by_date[date]
         # Format date nicely
         try:
-            dt = datetime.strptime(date, "%Y-%m-%d")
+            dt = date_cls.fromisoformat(date)
             day_name = dt.strftime("%A, %b %d")
         except ValueError:
             day_name = date
@@ -844,34 +920,35 @@ def process_weekly_preview() -> list:
     Process upcoming earnings for the current week.
     Returns list of embeds to post.
     """
-    tz = pytz.timezone(TIMEZONE)
-    now = datetime.now(tz)
+    now = datetime.now(_TZ)
 
     # Get Monday of current week
     monday = now - timedelta(days=now.weekday())
     friday = monday + timedelta(days=4)
 
-    start_date = monday.strftime("%Y-%m-%d")
-    end_date = friday.strftime("%Y-%m-%d")
-
-    print(f"Fetching earnings for week: {start_date} to {end_date}...")
+    start_date = monday.date().isoformat()
+    end_date = friday.date().isoformat()
 
-    # Fetch all earnings for the week from FMP
-    calendar = fetch_week_earnings(start_date, end_date)
-    print(f"Found {len(calendar)} total earnings reports this week from FMP")
+    log.info("Fetching earnings for week: %s to %s...", start_date, end_date)
 
-    # Filter to watched tickers
-    watched_earnings = filter_watched_earnings(calendar)
-    print(f"Found {len(watched_earnings)} watched companies from FMP")
+    # Fetch the week's earnings from FMP, filtered to watched tickers
+    total, watched_earnings = fetch_watched_earnings(start_date, end_date)
+    log.info("Found %s total earnings reports this week from FMP", total)
+    log.info("Found %s watched companies from FMP", len(watched_earnings))
 
-    # Use Perplexity fallback to catch tickers FMP missed
-    print("Checking Perplexity for any missed weekly earnings...")
-    missed_earnings = fetch_missing_weekly_earnings_perplexity(start_date, end_date, watched_earnings)
-    if missed_earnings:
-        print(f"Found {len(missed_earnings)} additional companies via Perplexity fallback")
-        watched_earnings.extend(missed_earnings)
+    # Use Perplexity fallback to catch tickers FMP missed, unless FMP
+    # already has every watched ticker this week
+    covered = {e.get("symbol", "").upper() for e in watched_earnings}
+    if covered >= WATCHED_TICKERS_SET:
+        log.info("FMP covers every watched ticker, skipping Perplexity fallback")
     else:
-        print("No additional earnings found via Perplexity")
+        log.info("Checking Perplexity for any missed weekly earnings...")
+        missed_earnings = fetch_missing_weekly_earnings_perplexity(start_date, end_date, watched_earnings)
+        if missed_earnings:
+            log.info("Found %s additional companies via Perplexity fallback", len(missed_earnings))
+            watched_earnings.extend(missed_earnings)
+        else:
+            log.info("No additional earnings found via Perplexity")
 
     if not watched_earnings:
         return []
@@ -880,28 +957,23 @@ def process_weekly_preview() -> list:
     return [create_weekly_preview_embed(watched_earnings)]
 
 
-def post_to_discord(embeds: list) -> bool:
-    """Post embeds to Discord webhook."""
-    if not DISCORD_WEBHOOK_URL:
-        print("Error: DISCORD_WEBHOOK_URL not set")
-        return False
-
-    # Discord allows max 10 embeds per message
-    for i in range(0, len(embeds), 10):
-        batch = embeds[i:i+10]
-        payload = {"embeds": batch}
+def post_to_discord(embeds: list, skip_unchanged: bool = True) -> bool:
+    """
+    Post embeds to the earnings Discord webhook.
+    Batches go out in order (summary first), paced off Discord's rate-limit
+    headers by the shared poster.
+    With skip_unchanged, embeds identical to the last successful post to
+    this webhook are not reposted (e.g. rerunning the same date).
+    """
+    digest = hashlib.blake2b(orjson.dumps(embeds, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+    if skip_unchanged and cache_get("discord_last_post", DISCORD_WEBHOOK_URL or "") == digest:
+        log.info("No change since the last post, skipping webhook (use --force to repost)")
+        return True
 
-        try:
-            response = requests.post(
-                DISCORD_WEBHOOK_URL,
-                json=payload,
-                timeout=30
-            )
-            response.raise_for_status()
-        except requests.RequestException as e:
-            print(f"Error posting to Discord: {e}")
-            return False
+    if not post_embeds(DISCORD_WEBHOOK_URL, embeds):
+        return False
 
+    cache_set("discord_last_post", DISCORD_WEBHOOK_URL, digest)
     return True
 
 
@@ -913,33 +985,181 @@ def save_buy_prices(buy_price_data: dict, filepath: str = "buy_prices.json"):
     existing = {}
     if os.path.exists(filepath):
         try:
-            with open(filepath, "r") as f:
-                existing = json.load(f)
-        except (json.JSONDecodeError, IOError):
+            with open(filepath, "rb") as f:
+                existing = orjson.loads(f.read())
+        except (orjson.JSONDecodeError, IOError):
             existing = {}
 
+    # Reruns usually produce the same entries; leave the file (and the
+    # workflow's data commit) alone then
+    if all(existing.get(ticker) == record for ticker, record in buy_price_data.items()):
+        log.info("Buy prices in %s already up to date", filepath)
+        return
+
     existing.update(buy_price_data)
 
-    with open(filepath, "w") as f:
-        json.dump(existing, f, indent=2)
+    # Write to a temp file and swap it in, so a crash mid-write can't leave
+    # a truncated file for the other bots to read
+    with open(filepath + ".tmp", "wb") as f:
+        f.write(orjson.dumps(existing, option=orjson.OPT_INDENT_2))
+    os.replace(filepath + ".tmp", filepath)
+
+    log.info("Saved buy prices for %s ticker(s) to %s", len(buy_price_data), filepath)
+
+
+def fiscal_quarter(announcement_date: str) -> tuple[Optional[int], Optional[int]]:
+    """Return the (quarter, fiscal year) a report announced on this date covers, or (None, None)."""
+    if not announcement_date:
+        return None, None
+    try:
+        dt = date_cls.fromisoformat(announcement_date)
+    except ValueError:
+        return None, None
+    quarter, year_offset = FISCAL_QUARTER_BY_MONTH[dt.month]
+    return quarter, dt.year + year_offset
+
+
+def _process_one(earning: dict, date: str, refresh: bool, pool: ThreadPoolExecutor,
+                 quotes: dict, bulk_insights: Future) -> tuple[dict, Optional[dict]]:
+    """
+    Build the embed for one reported earning, running its independent
+    lookups on pool. quotes holds the batch-fetched quotes by ticker, and
+    bulk_insights resolves to the tickers whose insights the bulk query
+    already cached.
+    Returns (embed, buy price record or None).
+    """
+    ticker = earning.get("symbol", "")
+    log.info("Processing %s...", ticker)
+    started = time.perf_counter()
+
+    # Get earnings data (stable API field names)
+    eps_actual = earning.get("epsActual")
+    eps_estimate = earning.get("epsEstimated")
+    revenue_actual = earning.get("revenueActual")
+    revenue_estimate = earning.get("revenueEstimated")
+
+    # Determine fiscal period from announcement date
+    announcement_date = earning.get("date", "")
+    quarter, year = fiscal_quarter(announcement_date)
+    fiscal_period = f"Q{quarter} {year}" if quarter else "Latest"
+
+    # Start every lookup that doesn't depend on another one. The calendar row
+    # sometimes carries the name already; only look up the profile when it doesn't
+    company_name = earning.get("name") or earning.get("companyName")
+    profile_future = None if company_name else pool.submit(fetch_company_profile, ticker)
+    prev_year_future = pool.submit(get_previous_year_earnings, ticker, announcement_date)
+    quote = quotes.get(ticker.upper())
+    quote_future = None if quote else pool.submit(fetch_stock_quote, ticker)
+
+    # Get ATH status from FMP's price history
+    ath_future = None
+    if announcement_date:
+        log.debug("  Checking ATH for %s...", ticker)
+        ath_future = pool.submit(check_all_time_high, ticker, announcement_date)
+
+    use_perplexity = bool(PERPLEXITY_API_KEY and year and quarter)
+    if use_perplexity and _out_of_time():
+        log.warning("  Run deadline passed, skipping Perplexity lookups for %s", ticker)
+        use_perplexity = False
+
+    # Get company name
+    if profile_future:
+        profile = profile_future.result()
+        company_name = profile.get("companyName", ticker) if profile else ticker
+
+    # Get previous year data for YoY comparison
+    try:
+        prev_year = prev_year_future.result()
+        if prev_year:
+            # FMP stable API uses revenueActual / epsActual in history too
+            revenue_previous = (
+                prev_year.get("revenueActual") or
+                prev_year.get("revenue")
+            )
+            eps_previous = (
+                prev_year.get("epsActual") or
+                prev_year.get("eps")
+            )
+            log.debug("  YoY data for %s: revenue=%s, eps=%s", ticker, revenue_previous, eps_previous)
+        else:
+            revenue_previous = None
+            eps_previous = None
+    except Exception as e:
+        log.warning("  YoY lookup failed for %s: %s", ticker, e)
+        revenue_previous = None
+        eps_previous = None
+
+    # Get stock quote for price movement
+    if quote_future:
+        quote = quote_future.result()
+    stock_change_percent, market_label = get_stock_change_percent(quote)
+    log.debug("  %s price movement: %s%% (%s)", ticker, stock_change_percent, market_label)
+
+    guidance = None
+    takeaways = None
+    is_ath = False
+    buy_price = None
+    if use_perplexity:
+        # Guidance, takeaways and buy price come from one prompt, which
+        # includes the current price, so it waits on the quote
+        log.debug("  Fetching guidance, takeaways and buy price for %s...", ticker)
+        current_price = quote.get("price") if quote else None
+        # Wait for the bulk query even without refresh: it is what fills the
+        # cache this lookup reads, and reports it just fetched are fresh even
+        # with refresh set
+        bulk_fetched = bulk_insights.result()
+        refresh_one = refresh and ticker not in bulk_fetched
+        guidance, takeaways, buy_price = fetch_earnings_insights(ticker, year, quarter, current_price, refresh_one)
+    if ath_future:
+        is_ath = ath_future.result()
+
+    # Create embed
+    embed = create_earnings_embed(
+        ticker=ticker,
+        company_name=company_name,
+        fiscal_period=fiscal_period,
+        revenue_actual=revenue_actual,
+        revenue_estimate=revenue_estimate,
+        revenue_previous=revenue_previous,
+        eps_actual=eps_actual,
+        eps_estimate=eps_estimate,
+        eps_previous=eps_previous,
+        guidance=guidance,
+        takeaways=takeaways,
+        is_ath=is_ath,
+        stock_change_percent=stock_change_percent,
+        stock_market_label=market_label,
+        buy_price=buy_price
+    )
+
+    log.info("  %s done in %.1fs", ticker, time.perf_counter() - started)
+
+    # Track buy price for saving
+    buy_price_record = None
+    if buy_price:
+        buy_price_record = {
+            "buy_price": buy_price,
+            "date": date,
+            "fiscal_period": fiscal_period
+        }
 
-    print(f"Saved buy prices for {len(buy_price_data)} ticker(s) to {filepath}")
+    return embed, buy_price_record
 
 
-def process_earnings(date: str) -> tuple[list, int, int, dict]:
+def process_earnings(date: str, refresh: bool = False) -> tuple[list, int, int, dict]:
     """
     Process earnings for a given date.
+    Only watched tickers get this far (fetch_watched_earnings filters the
+    calendar as it's fetched), so no lookup is spent on anything else.
+    With refresh set, cached Perplexity insights are refetched.
     Returns (embeds, beats, misses, buy_price_data).
     """
-    print(f"Fetching earnings for {date}...")
+    log.info("Fetching earnings for %s...", date)
 
-    # Get earnings calendar from FMP
-    calendar = fetch_earnings_calendar(date)
-    print(f"Found {len(calendar)} total earnings reports from FMP")
-
-    # Filter to watched tickers
-    watched_earnings = filter_watched_earnings(calendar)
-    print(f"Found {len(watched_earnings)} watched companies from FMP")
+    # Get earnings calendar from FMP, filtered to watched tickers
+    total, watched_earnings = fetch_watched_earnings(date)
+    log.info("Found %s total earnings reports from FMP", total)
+    log.info("Found %s watched companies from FMP", len(watched_earnings))
 
     # FMP Starter plan has a complete earnings calendar — Perplexity fallback no longer needed.
     # Keeping the function available in case specific tickers are still missing.
@@ -947,140 +1167,64 @@ def process_earnings(date: str) -> tuple[list, int, int, dict]:
     if not watched_earnings:
         return [], 0, 0, {}  # Return empty - don't post if no watched companies reported
 
-    embeds = []
+    # Beats/misses only need the calendar, so the summary can take its slot
+    # up front instead of being inserted ahead of the embeds afterwards
     total_beats = 0
     total_misses = 0
-    buy_price_data = {}
-
     for earning in watched_earnings:
-        ticker = earning.get("symbol", "")
-        print(f"Processing {ticker}...")
-
-        # Get company name
-        profile = fetch_company_profile(ticker)
-        company_name = profile.get("companyName", ticker) if profile else ticker
-
-        # Get earnings data (stable API field names)
         eps_actual = earning.get("epsActual")
         eps_estimate = earning.get("epsEstimated")
-        revenue_actual = earning.get("revenueActual")
-        revenue_estimate = earning.get("revenueEstimated")
-
-        # Determine fiscal period from announcement date
-        announcement_date = earning.get("date", "")
-
-        # Get previous year data for YoY comparison
-        try:
-            prev_year = get_previous_year_earnings(ticker, announcement_date)
-            if prev_year:
-                # FMP stable API uses revenueActual / epsActual in history too
-                revenue_previous = (
-                    prev_year.get("revenueActual") or
-                    prev_year.get("revenue")
-                )
-                eps_previous = (
-                    prev_year.get("epsActual") or
-                    prev_year.get("eps")
-                )
-                print(f"  YoY data for {ticker}: revenue={revenue_previous}, eps={eps_previous}")
-            else:
-                revenue_previous = None
-                eps_previous = None
-        except Exception as e:
-            print(f"  YoY lookup failed for {ticker}: {e}")
-            revenue_previous = None
-            eps_previous = None
-        quarter, year = None, None
-        if announcement_date:
-            try:
-                dt = datetime.strptime(announcement_date, "%Y-%m-%d")
-                # Earnings announced in Jan-Feb = Q4 of previous year
-                # Mar-Apr = Q1, May-Jul = Q2, Aug-Oct = Q3, Nov-Dec = Q4
-                month = dt.month
-                if month <= 2:
-                    quarter, year = 4, dt.year - 1
-                elif month <= 5:
-                    quarter, year = 1, dt.year
-                elif month <= 8:
-                    quarter, year = 2, dt.year
-                elif month <= 11:
-                    quarter, year = 3, dt.year
-                else:
-                    quarter, year = 4, dt.year
-                fiscal_period = f"Q{quarter} {year}"
-            except ValueError:
-                fiscal_period = "Latest"
-        else:
-            fiscal_period = "Latest"
-
-        # Get stock quote for price movement
-        print(f"  Fetching stock quote for {ticker}...")
-        quote = fetch_stock_quote(ticker)
-        stock_change_percent, market_label = get_stock_change_percent(quote)
-        print(f"  {ticker} price movement: {stock_change_percent}% ({market_label})")
-
-        # Get guidance, takeaways, ATH status, and buy price using Perplexity AI
-        guidance = None
-        takeaways = None
-        is_ath = False
-        buy_price = None
-        if PERPLEXITY_API_KEY and year and quarter:
-            print(f"  Fetching guidance for {ticker}...")
-            guidance = fetch_earnings_guidance(ticker, year, quarter)
-            print(f"  Fetching takeaways for {ticker}...")
-            takeaways = fetch_key_takeaways(ticker, year, quarter)
-            print(f"  Checking ATH for {ticker}...")
-            is_ath = check_all_time_high(ticker, announcement_date)
-            print(f"  Fetching recommended buy price for {ticker}...")
-            current_price = quote.get("price") if quote else None
-            buy_price = fetch_recommended_buy_price(ticker, year, quarter, current_price)
-
-        # Count beats/misses
         if eps_actual is not None and eps_estimate is not None:
             if eps_actual > eps_estimate:
                 total_beats += 1
             elif eps_actual < eps_estimate:
                 total_misses += 1
 
-        # Create embed
-        embed = create_earnings_embed(
-            ticker=ticker,
-            company_name=company_name,
-            fiscal_period=fiscal_period,
-            revenue_actual=revenue_actual,
-            revenue_estimate=revenue_estimate,
-            revenue_previous=revenue_previous,
-            eps_actual=eps_actual,
-            eps_estimate=eps_estimate,
-            eps_previous=eps_previous,
-            guidance=guidance,
-            takeaways=takeaways,
-            is_ath=is_ath,
-            stock_change_percent=stock_change_percent,
-            stock_market_label=market_label,
-            buy_price=buy_price
-        )
-        embeds.append(embed)
-
-        # Track buy price for saving
-        if buy_price:
-            buy_price_data[ticker] = {
-                "buy_price": buy_price,
-                "date": date,
-                "fiscal_period": fiscal_period
-            }
+    embeds = []
+    if len(watched_earnings) > 1:
+        embeds.append(create_summary_embed(len(watched_earnings), total_beats, total_misses))
+    buy_price_data = {}
 
-    # Add summary embed at the beginning
-    if len(embeds) > 1:
-        summary = create_summary_embed(len(embeds), total_beats, total_misses)
-        embeds.insert(0, summary)
+    # One request for every watched ticker's quote instead of one each
+    quotes = fetch_stock_quotes_bulk([e.get("symbol", "") for e in watched_earnings])
+
+    # Tickers are processed side by side, each overlapping its own lookups on
+    # a shared pool; a separate pool for tickers means a ticker waiting on its
+    # lookups never holds a slot those lookups need
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as lookup_pool, \
+            ThreadPoolExecutor(max_workers=TICKER_WORKERS) as ticker_pool:
+        # One Perplexity query for every report's insights, running alongside
+        # the FMP lookups; reports it misses fall back to their own query
+        reports = []
+        for earning in watched_earnings:
+            ticker = earning.get("symbol", "")
+            quarter, year = fiscal_quarter(earning.get("date", ""))
+            if quarter:
+                quote = quotes.get(ticker.upper())
+                reports.append((ticker, year, quarter, quote.get("price") if quote else None))
+        bulk_insights = lookup_pool.submit(fetch_earnings_insights_bulk, reports, refresh)
+
+        futures = [
+            ticker_pool.submit(_process_one, earning, date, refresh, lookup_pool, quotes, bulk_insights)
+            for earning in watched_earnings
+        ]
+
+        # Collect in calendar order so the embeds post in a stable order
+        for earning, future in zip(watched_earnings, futures):
+            embed, buy_price_record = future.result()
+            embeds.append(embed)
+            if buy_price_record:
+                buy_price_data[earning.get("symbol", "")] = buy_price_record
 
     return embeds, total_beats, total_misses, buy_price_data
 
 
-def run_test():
-    """Run with sample data to test Discord formatting."""
-    print("Running test with sample data...")
+def run_test(dry_run: bool = False):
+    """
+    Run with sample data to test Discord formatting.
+    With dry_run, the embeds are printed as JSON instead of posted.
+    """
+    log.info("Running test with sample data...")
 
     test_embeds = [
         create_summary_embed(3, 2, 1),
@@ -1128,10 +1272,14 @@ def run_test():
         ),
     ]
 
-    if post_to_discord(test_embeds):
-        print("✅ Test embeds posted successfully!")
+    if dry_run:
+        print(orjson.dumps(test_embeds, option=orjson.OPT_INDENT_2).decode())
+        return
+
+    if post_to_discord(test_embeds, skip_unchanged=False):
+        log.info("✅ Test embeds posted successfully!")
     else:
-        print("❌ Failed to post test embeds")
+        log.error("❌ Failed to post test embeds")
 
 
 def main():
@@ -1140,49 +1288,70 @@ def main():
     parser.add_argument("--weekly", action="store_true", help="Post weekly preview of upcoming earnings")
     parser.add_argument("--test", action="store_true", help="Run with test data")
     parser.add_argument("--dry-run", action="store_true", help="Process but don't post to Discord")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached Perplexity insights and refetch them")
+    parser.add_argument("--verbose", action="store_true", help="Log each ticker's lookup details")
+    parser.add_argument("--force", action="store_true", help="Post even if the embeds match the last post")
     args = parser.parse_args()
 
+    # Plain messages on stdout. LOG_LEVEL (e.g. WARNING) mutes progress
+    # output for this module and the shared helpers alike
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    set_log_level(log, args.verbose)
+
+    # The workflow restores .cache/ on every run; drop entries nothing reads any more
+    pruned = prune_cache()
+    if pruned:
+        log.debug("Pruned %s stale cache entries", pruned)
+
     # Validate environment
     if not FMP_API_KEY:
-        print("Error: FMP_API_KEY environment variable not set")
-        print("Sign up at https://financialmodelingprep.com/developer")
+        log.error("Error: FMP_API_KEY environment variable not set")
+        log.info("Sign up at https://financialmodelingprep.com/developer")
         sys.exit(1)
 
     if not DISCORD_WEBHOOK_URL and not args.dry_run:
-        print("Error: DISCORD_WEBHOOK_URL environment variable not set")
+        log.error("Error: DISCORD_WEBHOOK_URL environment variable not set")
         sys.exit(1)
 
     # Run test mode
     if args.test:
-        run_test()
+        run_test(args.dry_run)
         return
 
     # Run weekly preview mode
     if args.weekly:
-        print("Running weekly preview...")
+        log.info("Running weekly preview...")
         embeds = process_weekly_preview()
 
         if not embeds:
-            print("✅ No watched companies reporting this week - nothing to post")
+            log.info("✅ No watched companies reporting this week - nothing to post")
             return
 
         if args.dry_run:
-            print(f"\n[DRY RUN] Would post weekly preview")
+            log.info("\n[DRY RUN] Would post weekly preview")
             return
 
-        if post_to_discord(embeds):
-            print("✅ Posted weekly preview to Discord")
+        if post_to_discord(embeds, skip_unchanged=not args.force):
+            log.info("✅ Posted weekly preview to Discord")
         else:
-            print("❌ Failed to post weekly preview")
+            log.error("❌ Failed to post weekly preview")
             sys.exit(1)
         return
 
     # Determine date to check
     check_date = args.date or get_yesterday_date()
-    print(f"Checking earnings for: {check_date}")
+
+    # Nobody on the watchlist reports on a weekend, so the scheduled Monday
+    # run (checking Sunday) skips the API calls. An explicit --date is
+    # always checked
+    if not args.date and date_cls.fromisoformat(check_date).weekday() >= 5:
+        log.info("✅ %s is a weekend - nothing to check", check_date)
+        return
+
+    log.info("Checking earnings for: %s", check_date)
 
     # Process earnings
-    embeds, beats, misses, buy_price_data = process_earnings(check_date)
+    embeds, beats, misses, buy_price_data = process_earnings(check_date, refresh=args.refresh)
 
     # Save buy prices (even on dry run, so they can be tested)
     if buy_price_data:
@@ -1190,21 +1359,21 @@ def main():
 
     # Skip if no watched companies reported
     if not embeds:
-        print("✅ No watched companies reported earnings today - nothing to post")
+        log.info("✅ No watched companies reported earnings today - nothing to post")
         return
 
     if args.dry_run:
-        print(f"\n[DRY RUN] Would post {len(embeds)} embeds to Discord")
-        print(f"Beats: {beats}, Misses: {misses}")
+        log.info("\n[DRY RUN] Would post %s embeds to Discord", len(embeds))
+        log.info("Beats: %s, Misses: %s", beats, misses)
         for embed in embeds:
-            print(f"  - {embed.get('title', 'No title')}")
+            log.info("  - %s", embed.get('title', 'No title'))
         return
 
     # Post to Discord
-    if post_to_discord(embeds):
-        print(f"✅ Posted {len(embeds)} embeds to Discord")
+    if post_to_discord(embeds, skip_unchanged=not args.force):
+        log.info("✅ Posted %s embeds to Discord", len(embeds))
     else:
-        print("❌ Failed to post to Discord")
+        log.error("❌ Failed to post to Discord")
         sys.exit(1)
 
 
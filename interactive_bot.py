@@ -16,13 +16,17 @@ Commands (when @mentioning the bot):
 
 import os
 import re
-import json
+import asyncio
+import time
 from typing import Optional
+import orjson
 import requests
 import discord
 from discord import Embed
 from dotenv import load_dotenv
 
+from bots_common import SESSION
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -33,45 +37,107 @@ FMP_STABLE_URL = "https://financialmodelingprep.com/stable"
 
 BUY_PRICES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "buy_prices.json")
 
+# Seconds a fetched quote is reused, as {ticker: (fetched at, quote)}
+QUOTE_CACHE_TTL = 30
+_QUOTE_CACHE = {}
+
+# Patterns used on every message, compiled once
+_MENTION_RE = re.compile(r'<@!?\d+>')
+# Uppercase, to match the text extract_ticker compares against
+_STOPWORDS = frozenset({
+    "WHAT", "WHATS", "WHAT'S", "IS", "THE", "BUY", "PRICE", "QUOTE", "OF", "FOR", "CURRENT", "GET", "SHOW",
+    "CHECK",
+})
+_TICKER_RE = re.compile(r'\b([A-Z]{1,5})\b')
+_FAST_TICKER_RE = re.compile(r'[A-Za-z]{1,5}')
+_PRICE_RE = re.compile(r'\$?([\d,]+\.?\d*)')
+# Words (apostrophes kept for "what's"), so punctuation never sticks to a stopword
+_WORD_RE = re.compile(r"[A-Z']+")
 
-def load_buy_prices(filepath: str = BUY_PRICES_FILE) -> dict:
-    """Load buy prices from JSON file."""
-    if not os.path.exists(filepath):
-        return {}
 
+# Parsed buy_prices.json by path, as (mtime_ns, data, {ticker: Buy Below
+# as a float}); reparsed only when EarningsBot rewrites the file
+_BUY_PRICES_CACHE = {}
+
+
+def _load_buy_prices_cached(filepath: str) -> tuple[dict, dict]:
     try:
-        with open(filepath, "r") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return {}
+        mtime = os.stat(filepath).st_mtime_ns
+    except OSError:
+        return {}, {}
+
+    cached = _BUY_PRICES_CACHE.get(filepath)
+    if cached and cached[0] == mtime:
+        return cached[1], cached[2]
+
+    try:
+        with open(filepath, "rb") as f:
+            data = orjson.loads(f.read())
+    except (orjson.JSONDecodeError, IOError):
+        return {}, {}
+
+    # Parse each "Buy Below" string once per file version, not per reply
+    floats = {}
+    if isinstance(data, dict):
+        for ticker, record in data.items():
+            price_str = record.get("buy_price") if isinstance(record, dict) else None
+            floats[ticker] = parse_price(price_str) if isinstance(price_str, str) else None
+
+    _BUY_PRICES_CACHE[filepath] = (mtime, data, floats)
+    return data, floats
+
+
+def load_buy_prices(filepath: str = BUY_PRICES_FILE) -> dict:
+    """
+    Load buy prices from JSON file.
+    The parsed dict is reused until the file's mtime changes; callers must
+    treat it as read-only.
+    """
+    return _load_buy_prices_cached(filepath)[0]
+
+
+def load_buy_price_floats(filepath: str = BUY_PRICES_FILE) -> dict:
+    """Return {ticker: Buy Below price as a float, or None}, cached like load_buy_prices."""
+    return _load_buy_prices_cached(filepath)[1]
 
 
 def parse_price(price_str: str) -> Optional[float]:
     """Parse a dollar amount string like '$190.00' into a float."""
-    match = re.search(r'\$?([\d,]+\.?\d*)', price_str)
+    match = _PRICE_RE.search(price_str)
     if match:
         return float(match.group(1).replace(",", ""))
     return None
 
 
 def fetch_stock_quote(ticker: str) -> Optional[dict]:
-    """Fetch real-time stock quote from FMP API."""
+    """
+    Fetch real-time stock quote from FMP API.
+    A quote fetched in the last QUOTE_CACHE_TTL seconds is reused, so a
+    burst of questions about one ticker makes one request.
+    """
     if not FMP_API_KEY:
         return None
 
+    cached = _QUOTE_CACHE.get(ticker)
+    if cached and time.monotonic() - cached[0] < QUOTE_CACHE_TTL:
+        return cached[1]
+
     url = f"{FMP_STABLE_URL}/quote"
     params = {"symbol": ticker, "apikey": FMP_API_KEY}
 
     try:
-        response = requests.get(url, params=params, timeout=30)
+        response = SESSION.get(url, params=params, timeout=30)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         if isinstance(data, list) and data:
-            return data[0]
+            quote = data[0]
         elif isinstance(data, dict):
-            return data
-        return None
-    except requests.RequestException:
+            quote = data
+        else:
+            return None
+        _QUOTE_CACHE[ticker] = (time.monotonic(), quote)
+        return quote
+    except (requests.RequestException, orjson.JSONDecodeError):
         return None
 
 
@@ -81,29 +147,41 @@ def extract_ticker(message_text: str) -> Optional[str]:
     Handles various formats like:
         "AMZN", "price AMZN", "what's the buy price of AMZN?",
         "buy price for AMZN", "AMZN buy price"
+    Returns the ticker uppercased, ready for buy_prices lookups.
     """
     # Remove bot mention and clean up
-    text = re.sub(r'<@!?\d+>', '', message_text).strip()
+    text = _MENTION_RE.sub('', message_text).strip()
 
-    # Remove common words to isolate the ticker
-    text = re.sub(r'\b(what|whats|what\'s|is|the|buy|price|of|for|current|get|show|check)\b', '', text, flags=re.IGNORECASE)
-    text = text.strip('? .,!')
+    # Most messages are just the ticker; skip the stopword pass for those
+    # (a lone stopword like "price" still falls through and is dropped)
+    if _FAST_TICKER_RE.fullmatch(text) and (ticker := text.upper()) not in _STOPWORDS:
+        return ticker
+
+    # Remove common words to isolate the ticker. Whole words are dropped, so
+    # "what's" no longer leaves a stray "s" behind to be read as a ticker.
+    # Splitting on anything but letters and apostrophes drops punctuation, so "price:"
+    # or "(buy)" is still recognised as a stopword
+    text = " ".join(word for word in _WORD_RE.findall(text.upper()) if word not in _STOPWORDS)
 
     # Look for an uppercase ticker-like word (1-5 uppercase letters)
-    # Try the cleaned text first
-    match = re.search(r'\b([A-Z]{1,5})\b', text.upper())
+    match = _TICKER_RE.search(text)
     if match:
         return match.group(1)
 
     return None
 
 
-def create_buy_price_embed(ticker: str, buy_data: dict, current_price: Optional[float] = None) -> Embed:
-    """Create a Discord embed showing the buy price for a ticker."""
+def create_buy_price_embed(ticker: str, buy_data: dict, current_price: Optional[float] = None,
+                           buy_price: Optional[float] = None) -> Embed:
+    """
+    Create a Discord embed showing the buy price for a ticker.
+    buy_price is the already parsed Buy Below price, if the caller has it.
+    """
     buy_price_str = buy_data.get("buy_price", "N/A")
     fiscal_period = buy_data.get("fiscal_period", "Unknown")
     date = buy_data.get("date", "Unknown")
-    buy_price = parse_price(buy_price_str)
+    if buy_price is None and isinstance(buy_price_str, str):
+        buy_price = parse_price(buy_price_str)
 
     # Determine color based on current price vs buy price
     if current_price and buy_price:
@@ -136,8 +214,26 @@ def create_buy_price_embed(ticker: str, buy_data: dict, current_price: Optional[
     return embed
 
 
+# Last list embed built, as (buy prices dict it was built from, embed)
+_LIST_EMBED_CACHE = (None, None)
+
+
 def create_list_embed(buy_prices: dict) -> Embed:
-    """Create an embed listing all tracked buy prices."""
+    """
+    Create an embed listing all tracked buy prices.
+    load_buy_prices hands out the same dict until the file changes, so the
+    embed built for that dict is reused.
+    """
+    global _LIST_EMBED_CACHE
+    if _LIST_EMBED_CACHE[0] is buy_prices:
+        return _LIST_EMBED_CACHE[1]
+
+    embed = _build_list_embed(buy_prices)
+    _LIST_EMBED_CACHE = (buy_prices, embed)
+    return embed
+
+
+def _build_list_embed(buy_prices: dict) -> Embed:
     if not buy_prices:
         return Embed(
             title="🐕 Tracked Buy Prices",
@@ -145,16 +241,15 @@ def create_list_embed(buy_prices: dict) -> Embed:
             color=0x808080
         )
 
-    lines = []
-    for ticker in sorted(buy_prices.keys()):
-        data = buy_prices[ticker]
-        price = data.get("buy_price", "N/A")
-        period = data.get("fiscal_period", "")
-        lines.append(f"**{ticker}** — {price} ({period})")
+    # One pass over the sorted records, each dict looked up once
+    description = "\n".join(
+        f"**{ticker}** — {data.get('buy_price', 'N/A')} ({data.get('fiscal_period', '')})"
+        for ticker, data in sorted(buy_prices.items())
+    )
 
     embed = Embed(
         title="🐕 All Tracked Buy Prices",
-        description="\n".join(lines),
+        description=description,
         color=0x5865F2
     )
     embed.set_footer(text=f"Woof of Wall Street • {len(buy_prices)} stocks tracked")
@@ -162,8 +257,7 @@ def create_list_embed(buy_prices: dict) -> Embed:
     return embed
 
 
-def create_help_embed() -> Embed:
-    """Create a help embed showing available commands."""
+def _build_help_embed() -> Embed:
     embed = Embed(
         title="🐕 Woof of Wall Street — Help",
         description="Mention me and ask about any tracked stock!",
@@ -191,11 +285,28 @@ def create_help_embed() -> Embed:
     return embed
 
 
+# The help text never changes and embeds are only ever sent, so one is
+# built at import and shared by every reply
+_HELP_EMBED = _build_help_embed()
+
+
+def create_help_embed() -> Embed:
+    """Create a help embed showing available commands."""
+    return _HELP_EMBED
+
+
+_NOT_FOUND_DESC_FMT = (
+    "**{ticker}** doesn't have a buy price set yet.\n\n"
+    "Buy prices are automatically generated after a company reports earnings. "
+    "Use `@Woof of Wall Street list` to see all tracked stocks."
+)
+
+
 def create_not_found_embed(ticker: str) -> Embed:
     """Create an embed for when a ticker isn't tracked."""
     return Embed(
         title=f"❓ {ticker} Not Found",
-        description=f"**{ticker}** doesn't have a buy price set yet.\n\nBuy prices are automatically generated after a company reports earnings. Use `@Woof of Wall Street list` to see all tracked stocks.",
+        description=_NOT_FOUND_DESC_FMT.format(ticker=ticker),
         color=0xFF0000
     )
 
@@ -227,7 +338,7 @@ async def on_message(message):
         return
 
     # Get the message text without the mention
-    text = re.sub(r'<@!?\d+>', '', message.content).strip().lower()
+    text = _MENTION_RE.sub('', message.content).strip().lower()
 
     # Handle "help" command
     if text in ("help", "commands", "?"):
@@ -249,18 +360,18 @@ async def on_message(message):
 
     # Look up the ticker
     buy_prices = load_buy_prices()
-    ticker = ticker.upper()
 
     if ticker not in buy_prices:
         await message.channel.send(embed=create_not_found_embed(ticker))
         return
 
-    # Fetch current price
-    quote = fetch_stock_quote(ticker)
+    # Fetch current price off the event loop, so a slow FMP response doesn't
+    # stall replies to everyone else
+    quote = await asyncio.to_thread(fetch_stock_quote, ticker)
     current_price = quote.get("price") if quote else None
 
     # Send the buy price embed
-    embed = create_buy_price_embed(ticker, buy_prices[ticker], current_price)
+    embed = create_buy_price_embed(ticker, buy_prices[ticker], current_price, load_buy_price_floats().get(ticker))
     await message.channel.send(embed=embed)
 
 
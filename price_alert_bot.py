@@ -10,17 +10,27 @@ Usage:
     python price_alert_bot.py              # Check all tracked stocks
     python price_alert_bot.py --test       # Test with sample data
     python price_alert_bot.py --dry-run    # Process but don't post to Discord
+    python price_alert_bot.py --verbose    # Also log each ticker's price check
 """
 
 import os
 import sys
 import re
-import json
 import argparse
+import logging
 from typing import Optional
+import orjson
 import requests
 from dotenv import load_dotenv
 
+from bots_common import SESSION, set_log_level
+from bots_common import fetch_stock_quotes_bulk as fetch_quotes_bulk
+from bots_common import post_to_discord as post_embeds
+
+# All progress output goes through this logger; --verbose shows the
+# per-ticker lines and LOG_LEVEL sets the threshold otherwise
+log = logging.getLogger(__name__)
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -31,24 +41,26 @@ FMP_STABLE_URL = "https://financialmodelingprep.com/stable"
 
 BUY_PRICES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "buy_prices.json")
 
+_PRICE_RE = re.compile(r'\$?([\d,]+\.?\d*)')
+
 
 def load_buy_prices(filepath: str = BUY_PRICES_FILE) -> dict:
     """Load buy prices from JSON file."""
     if not os.path.exists(filepath):
-        print(f"No buy prices file found at {filepath}")
+        log.info("No buy prices file found at %s", filepath)
         return {}
 
     try:
-        with open(filepath, "r") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError) as e:
-        print(f"Error reading buy prices file: {e}")
+        with open(filepath, "rb") as f:
+            return orjson.loads(f.read())
+    except (orjson.JSONDecodeError, IOError) as e:
+        log.error("Error reading buy prices file: %s", e)
         return {}
 
 
 def parse_price(price_str: str) -> Optional[float]:
     """Parse a dollar amount string like '$190.00' into a float."""
-    match = re.search(r'\$?([\d,]+\.?\d*)', price_str)
+    match = _PRICE_RE.search(price_str)
     if match:
         return float(match.group(1).replace(",", ""))
     return None
@@ -60,19 +72,24 @@ def fetch_stock_quote(ticker: str) -> Optional[dict]:
     params = {"symbol": ticker, "apikey": FMP_API_KEY}
 
     try:
-        response = requests.get(url, params=params, timeout=30)
+        response = SESSION.get(url, params=params, timeout=30)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         if isinstance(data, list) and data:
             return data[0]
         elif isinstance(data, dict):
             return data
         return None
-    except requests.RequestException as e:
-        print(f"Error fetching quote for {ticker}: {e}")
+    except (requests.RequestException, orjson.JSONDecodeError) as e:
+        log.warning("Error fetching quote for %s: %s", ticker, e)
         return None
 
 
+def fetch_stock_quotes_bulk(tickers: list) -> dict:
+    """Fetch quotes for several tickers (see bots_common.fetch_stock_quotes_bulk)."""
+    return fetch_quotes_bulk(tickers, FMP_API_KEY)
+
+
 def create_alert_embed(ticker: str, current_price: float, buy_below: float, discount_pct: float, fiscal_period: str) -> dict:
     """Create a Discord embed for a price alert."""
     return {
@@ -124,52 +141,52 @@ def process_alerts() -> list:
     buy_prices = load_buy_prices()
 
     if not buy_prices:
-        print("No buy prices tracked yet")
+        log.info("No buy prices tracked yet")
         return []
 
-    print(f"Checking {len(buy_prices)} tracked stocks...")
+    log.info("Checking %s tracked stocks...", len(buy_prices))
+
+    # One request per QUOTE_BATCH_SIZE tickers instead of one each
+    quotes = fetch_stock_quotes_bulk(list(buy_prices))
 
     alerts = []
+    get_quote = quotes.get
 
     for ticker, data in buy_prices.items():
         buy_price_str = data.get("buy_price", "")
-        fiscal_period = data.get("fiscal_period", "Unknown")
 
         buy_below = parse_price(buy_price_str)
         if buy_below is None:
-            print(f"  Skipping {ticker}: could not parse buy price '{buy_price_str}'")
+            log.warning("  Skipping %s: could not parse buy price '%s'", ticker, buy_price_str)
             continue
 
-        print(f"  Checking {ticker} (Buy Below: ${buy_below:.2f})...")
-        quote = fetch_stock_quote(ticker)
-
-        if not quote:
-            print(f"  Could not fetch quote for {ticker}")
+        log.debug("  Checking %s (Buy Below: $%.2f)...", ticker, buy_below)
+        if not (quote := get_quote(ticker.upper()) or fetch_stock_quote(ticker)):
+            log.warning("  Could not fetch quote for %s", ticker)
             continue
 
-        current_price = quote.get("price")
-        if current_price is None:
-            print(f"  No price data for {ticker}")
+        if (current_price := quote.get("price")) is None:
+            log.warning("  No price data for %s", ticker)
             continue
 
-        print(f"    Current: ${current_price:.2f} vs Buy Below: ${buy_below:.2f}")
+        log.debug("    Current: $%.2f vs Buy Below: $%.2f", current_price, buy_below)
 
-        if current_price <= buy_below:
-            discount_pct = ((buy_below - current_price) / buy_below) * 100
-            print(f"    🚨 ALERT: {ticker} is {discount_pct:.1f}% below buy price!")
+        # Signed distance from the buy price, positive when below it
+        discount_pct = (buy_below - current_price) / buy_below * 100
+        if discount_pct >= 0:
+            log.info("    🚨 ALERT: %s is %.1f%% below buy price!", ticker, discount_pct)
             alerts.append(create_alert_embed(
                 ticker=ticker,
                 current_price=current_price,
                 buy_below=buy_below,
                 discount_pct=discount_pct,
-                fiscal_period=fiscal_period
+                fiscal_period=data.get("fiscal_period", "Unknown")
             ))
         else:
-            above_pct = ((current_price - buy_below) / buy_below) * 100
-            print(f"    ✅ {ticker} is {above_pct:.1f}% above buy price")
+            log.debug("    ✅ %s is %.1f%% above buy price", ticker, -discount_pct)
 
     if not alerts:
-        print("\nNo stocks below their Buy Below price")
+        log.info("\nNo stocks below their Buy Below price")
         return []
 
     # Add summary at the beginning
@@ -180,33 +197,13 @@ def process_alerts() -> list:
 
 
 def post_to_discord(embeds: list) -> bool:
-    """Post embeds to Discord webhook."""
-    if not DISCORD_WEBHOOK_URL:
-        print("Error: DISCORD_WEBHOOK_URL not set")
-        return False
-
-    # Discord allows max 10 embeds per message
-    for i in range(0, len(embeds), 10):
-        batch = embeds[i:i+10]
-        payload = {"embeds": batch}
-
-        try:
-            response = requests.post(
-                DISCORD_WEBHOOK_URL,
-                json=payload,
-                timeout=30
-            )
-            response.raise_for_status()
-        except requests.RequestException as e:
-            print(f"Error posting to Discord: {e}")
-            return False
-
-    return True
+    """Post embeds to the price alert Discord webhook."""
+    return post_embeds(DISCORD_WEBHOOK_URL, embeds)
 
 
 def run_test():
     """Run with sample data to test Discord formatting."""
-    print("Running test with sample data...")
+    log.info("Running test with sample data...")
 
     test_embeds = [
         create_summary_embed(2, 5),
@@ -227,24 +224,30 @@ def run_test():
     ]
 
     if post_to_discord(test_embeds):
-        print("✅ Test embeds posted successfully!")
+        log.info("✅ Test embeds posted successfully!")
     else:
-        print("❌ Failed to post test embeds")
+        log.error("❌ Failed to post test embeds")
 
 
 def main():
     parser = argparse.ArgumentParser(description="PriceAlertBot - Buy price alerts")
     parser.add_argument("--test", action="store_true", help="Run with test data")
     parser.add_argument("--dry-run", action="store_true", help="Process but don't post to Discord")
+    parser.add_argument("--verbose", action="store_true", help="Log each ticker's price check")
     args = parser.parse_args()
 
+    # Same setup as earnings_bot: plain messages on stdout, with LOG_LEVEL
+    # or --verbose applied to this module and the shared helpers
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    set_log_level(log, args.verbose)
+
     # Validate environment
     if not FMP_API_KEY:
-        print("Error: FMP_API_KEY environment variable not set")
+        log.error("Error: FMP_API_KEY environment variable not set")
         sys.exit(1)
 
     if not DISCORD_WEBHOOK_URL and not args.dry_run:
-        print("Error: DISCORD_WEBHOOK_URL environment variable not set")
+        log.error("Error: DISCORD_WEBHOOK_URL environment variable not set")
         sys.exit(1)
 
     # Run test mode
@@ -256,20 +259,20 @@ def main():
     embeds = process_alerts()
 
     if not embeds:
-        print("✅ No price alerts to post")
+        log.info("✅ No price alerts to post")
         return
 
     if args.dry_run:
-        print(f"\n[DRY RUN] Would post {len(embeds)} embeds to Discord")
+        log.info("\n[DRY RUN] Would post %s embeds to Discord", len(embeds))
         for embed in embeds:
-            print(f"  - {embed.get('title', 'No title')}")
+            log.info("  - %s", embed.get('title', 'No title'))
         return
 
     # Post to Discord
     if post_to_discord(embeds):
-        print(f"✅ Posted {len(embeds)} price alerts to Discord")
+        log.info("✅ Posted %s price alerts to Discord", len(embeds))
     else:
-        print("❌ Failed to post price alerts")
+        log.error("❌ Failed to post price alerts")
         sys.exit(1)
 
 
@@ -0,0 +1,65 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+import requests
+
+import bots_common
+
+
+class _Handler(BaseHTTPRequestHandler):
+    statuses = []
+    hits = 0
+
+    def do_POST(self):
+        type(self).hits += 1
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        status = self.statuses.pop(0) if self.statuses else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = HTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    _Handler.hits = 0
+    # Same adapter and Retry as the shared session, over plain HTTP
+    session = requests.Session()
+    session.mount("http://", bots_common.SESSION.adapters["https://"])
+    yield session, f"http://127.0.0.1:{httpd.server_port}/"
+    httpd.shutdown()
+
+
+def test_post_retries_bare_429(server, monkeypatch):
+    monkeypatch.setattr(bots_common._PostSafeRetry, "sleep", lambda self, response=None: None)
+    session, url = server
+    _Handler.statuses = [429, 429]
+    assert session.post(url, data=b"{}", timeout=5).status_code == 200
+    assert _Handler.hits == 3
+
+
+def test_post_does_not_retry_500(server):
+    session, url = server
+    _Handler.statuses = [500]
+    assert session.post(url, data=b"{}", timeout=5).status_code == 500
+    assert _Handler.hits == 1
+
+
+def test_prune_cache_drops_only_old_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(bots_common, "CACHE_DIR", str(tmp_path))
+    bots_common.cache_set("fmp_calendar", "old", [1, []])
+    bots_common.cache_set("fmp_calendar", "new", [2, []])
+    old_path = bots_common._cache_path("fmp_calendar", "old")
+    stamp = os.path.getmtime(old_path) - bots_common.CACHE_MAX_AGE - 60
+    os.utime(old_path, (stamp, stamp))
+
+    assert bots_common.prune_cache() == 1
+    assert bots_common.cache_get("fmp_calendar", "old") is None
+    assert bots_common.cache_get("fmp_calendar", "new") == [2, []]
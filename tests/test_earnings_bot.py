@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+from unittest import mock
+
+import orjson
+import pytest
+
+import bots_common
+import earnings_bot
+
+
+def _earning(ticker):
+    return {"symbol": ticker, "date": "2026-01-28", "name": f"{ticker} Inc",
+            "epsActual": 1.2, "epsEstimated": 1.0, "revenueActual": 10.0, "revenueEstimated": 9.0}
+
+
+def test_multi_ticker_run_makes_one_insights_call():
+    cache = {}
+    calls = []
+    lock = threading.Lock()
+
+    def fake_perplexity(prompt, max_tokens, timeout=60, response_format=None, **kwargs):
+        with lock:
+            calls.append(prompt)
+        # Slow enough that per-ticker lookups would overtake an unawaited bulk query
+        time.sleep(0.2)
+        tickers = response_format["json_schema"]["schema"].get("required", [])
+        entry = {"guidance": "Up", "takeaways": ["Good"], "buy_price": "$10.00"}
+        if set(tickers) >= {"AAA", "BBB"}:
+            return orjson.dumps({t: entry for t in tickers}).decode()
+        return orjson.dumps(entry).decode()
+
+    with mock.patch.multiple(
+        earnings_bot,
+        PERPLEXITY_API_KEY="key",
+        fetch_watched_earnings=lambda date: (2, [_earning("AAA"), _earning("BBB")]),
+        fetch_stock_quotes_bulk=lambda tickers: {},
+        fetch_stock_quote=lambda ticker: None,
+        get_previous_year_earnings=lambda ticker, date: None,
+        check_all_time_high=lambda ticker, date: False,
+        cache_get=lambda ns, key, ttl=None: cache.get((ns, key)),
+        cache_set=lambda ns, key, value: cache.__setitem__((ns, key), value),
+        call_perplexity=fake_perplexity,
+    ):
+        embeds, beats, misses, buy_prices = earnings_bot.process_earnings("2026-01-28")
+
+    assert len(calls) == 1
+    assert set(buy_prices) == {"AAA", "BBB"}
+    assert len(embeds) == 3
+
+
+def _age_cache(cache_dir, seconds):
+    for root, _, files in os.walk(cache_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            stamp = os.path.getmtime(path) - seconds
+            os.utime(path, (stamp, stamp))
+
+
+@pytest.mark.parametrize("answer, calls_after_a_day", [
+    ({"guidance": "NO_GUIDANCE", "takeaways": [], "buy_price": ""}, 2),
+    ({"guidance": "Up", "takeaways": ["Good"], "buy_price": "$10.00"}, 1),
+])
+def test_only_complete_insights_are_cached_for_good(tmp_path, monkeypatch, answer, calls_after_a_day):
+    monkeypatch.setattr(bots_common, "CACHE_DIR", str(tmp_path))
+    calls = []
+
+    def fake_perplexity(prompt, max_tokens, timeout=60, response_format=None, **kwargs):
+        calls.append(prompt)
+        return orjson.dumps(answer).decode()
+
+    with mock.patch.multiple(earnings_bot, PERPLEXITY_API_KEY="key", call_perplexity=fake_perplexity):
+        earnings_bot.fetch_earnings_insights("AAA", 2026, 1)
+        earnings_bot.fetch_earnings_insights("AAA", 2026, 1)
+        assert len(calls) == 1
+        _age_cache(tmp_path, 24 * 3600)
+        earnings_bot.fetch_earnings_insights("AAA", 2026, 1)
+    assert len(calls) == calls_after_a_day
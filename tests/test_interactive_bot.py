@@ -0,0 +1,23 @@
+import pytest
+
+from interactive_bot import extract_ticker
+
+
+@pytest.mark.parametrize("text, ticker", [
+    ("<@123> AMZN", "AMZN"),
+    ("<@123> aapl", "AAPL"),
+    ("<@!123> price AMZN", "AMZN"),
+    ("<@123> what's the buy price of AMZN?", "AMZN"),
+    ("<@123> AMZN buy price", "AMZN"),
+    ("<@123> price: AMZN", "AMZN"),
+    ("<@123> quote; TSLA", "TSLA"),
+    ("<@123> (buy) NVDA", "NVDA"),
+    ("<@123> Price? TSLA!", "TSLA"),
+])
+def test_extract_ticker(text, ticker):
+    assert extract_ticker(text) == ticker
+
+
+@pytest.mark.parametrize("text", ["<@123> price", "<@123> buy price?", "<@123> is"])
+def test_extract_ticker_stopwords_only(text):
+    assert extract_ticker(text) is None